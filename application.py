@@ -3,12 +3,16 @@ import os
 
 import dash
 import dash_bootstrap_components as dbc
-from dash import callback, dcc, html
+from dash import dcc, html, no_update
 from dash.dependencies import Input, Output, State
 from flask import Flask
 
 
 import components.data  # Import data module to register callbacks
+from components.data.reload import start_reloader
+from components.data.warmup import register_readiness, start_warmup
+from components.common.filter_slider import create_filter_slider
+from components.common.year_slider import create_play_button, create_year_slider
 from components.sidebar import create_sidebar
 from components.tabs.geo_eco import create_geo_eco_tab
 from components.tabs.healthcare import create_healthcare_tab
@@ -16,6 +20,7 @@ from components.tabs.introduction import create_introduction_tab
 from components.tabs.trends import create_trends_tab
 from components.tabs.world_map import create_world_map_tab
 from components.chatbot import ChatbotComponent
+from components.callback_stats import register_callback_stats
 
 #  FontAwesome for icons
 FA = "https://use.fontawesome.com/releases/v5.15.4/css/all.css"
@@ -26,6 +31,9 @@ open_api_key = os.getenv("open_api_key")
 PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 print(csv_file)
 
+# Keep visited tabs mounted and hide the others instead of rebuilding them on every click
+PERSISTENT_TABS = os.getenv("PERSISTENT_TABS", "0") == "1"
+
 # Configure logging
 logging.basicConfig(
     level=logging.DEBUG, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -39,6 +47,8 @@ app = dash.Dash(
     suppress_callback_exceptions=True,
 )
 application = app.server
+register_callback_stats(server)
+register_readiness(server)
 
 chatbot = ChatbotComponent(
     open_api_key=open_api_key,
@@ -77,12 +87,50 @@ navbar = dbc.Navbar(
 )
 
 
+TAB_BUILDERS = {
+    0: create_introduction_tab,
+    1: create_world_map_tab,
+    2: create_geo_eco_tab,
+    3: create_healthcare_tab,
+    4: create_trends_tab,
+}
+
+# Tabs built without the sliders that are shared in the persistent layout
+SHARED_CONTROL_TABS = {1, 2, 3}
+
+
+def create_tab_panes():
+    """Tab panes for ``PERSISTENT_TABS``: one hidden pane per tab, filled on first visit.
+
+    The sliders used by several tabs would repeat their ids across the mounted panes, so
+    they are built once around the panes and shown only with the tabs that use them.
+    """
+    return [
+        # Indexes of the tabs whose pane has been built, in visiting order
+        dcc.Store(id="mounted-tabs", data=[0]),
+        html.Div(create_filter_slider(), id="shared-filter-controls", style={"display": "none"}),
+        html.Div(create_introduction_tab(), id="tab-pane-0"),
+        *[html.Div(id=f"tab-pane-{i}", style={"display": "none"}) for i in range(1, 5)],
+        html.Div(
+            create_year_slider(
+                play_controls=create_play_button() + create_play_button(client_playback=True)
+            ),
+            id="shared-year-controls",
+            style={"display": "none"},
+        ),
+    ]
+
+
 # Main Layout
 app.layout = html.Div(
     [
         dcc.Location(id="url", refresh=False),
         navbar,
         dcc.Store(id="general-data", data=[]),
+        # Filled together by components.data.data.get_filtered_data for every tab
+        dcc.Store(id="world-map-data"),
+        dcc.Store(id="geo-eco-data"),
+        dcc.Store(id="healthcare-data"),
         dbc.Row(
             [
                 # Sidebar
@@ -97,7 +145,11 @@ app.layout = html.Div(
                                 dcc.Store(id="tab-store", data={}),
                                 color="primary",
                             ),
-                            html.Div(id="tab-content"),
+                            *(
+                                create_tab_panes()
+                                if PERSISTENT_TABS
+                                else [html.Div(id="tab-content")]
+                            ),
                         ],
                         style={
                             "padding": "20px",
@@ -117,61 +169,104 @@ app.layout = html.Div(
 )
 
 
-# Callback to update active tab links
-@app.callback(
+# Callback to update active tab links, run in the browser
+app.clientside_callback(
+    """
+    function() {
+        const triggered = window.dash_clientside.callback_context.triggered.filter(
+            (t) => t.prop_id !== "."
+        );
+        const clicked = triggered.length ? triggered[0].prop_id.split(".")[0] : "tab-0-link";
+        return [0, 1, 2, 3, 4].map((i) => "tab-" + i + "-link" === clicked);
+    }
+    """,
     [Output(f"tab-{i}-link", "active") for i in range(5)],
     [Input(f"tab-{i}-link", "n_clicks") for i in range(5)],
 )
-def update_active_tab(*args):
-    ctx = dash.callback_context
-    if not ctx.triggered:
-        return [True] + [False] * 4
-    clicked_tab = ctx.triggered[0]["prop_id"].split(".")[0]
-    return [f"tab-{i}-link" == clicked_tab for i in range(5)]
-
-
-# Callback to update tab content
-@app.callback(
-    Output("tab-content", "children"),
-    [Input(f"tab-{i}-link", "active") for i in range(5)],
-    [State("tab-store", "data")],
-)
-def render_tab_content(*active_tabs):
-    ctx = dash.callback_context
-    if not ctx.triggered:
-        return create_introduction_tab()
-
-    tab_mapping = {
-        0: create_introduction_tab,
-        1: create_world_map_tab,
-        2: create_geo_eco_tab,
-        3: create_healthcare_tab,
-        4: create_trends_tab,
-    }
 
-    for i, is_active in enumerate(active_tabs):
-        if is_active:
-            return tab_mapping[i]()
 
-    return "No tab selected"
+if PERSISTENT_TABS:
+    # Show the active tab's pane and the shared sliders it uses, and add the tab to the
+    # mounted ones on its first visit; the panes of the other tabs keep their content
+    app.clientside_callback(
+        """
+        function(...args) {
+            const active = args.slice(0, 5);
+            const [mounted, playStyle, mapPlayStyle] = args.slice(5);
+            const tab = Math.max(active.indexOf(true), 0);
+            const show = (visible) => ({display: visible ? "block" : "none"});
+            return [
+                ...active.map((_, i) => show(i === tab)),
+                show(tab === 2 || tab === 3),
+                show(tab >= 1 && tab <= 3),
+                Object.assign({}, playStyle, {display: tab === 1 ? "none" : "inline"}),
+                Object.assign({}, mapPlayStyle, {display: tab === 1 ? "inline" : "none"}),
+                mounted.includes(tab) ? window.dash_clientside.no_update : mounted.concat([tab]),
+            ];
+        }
+        """,
+        [Output(f"tab-pane-{i}", "style") for i in range(5)],
+        Output("shared-filter-controls", "style"),
+        Output("shared-year-controls", "style"),
+        Output("play-button", "style"),
+        Output("map-play-button", "style"),
+        Output("mounted-tabs", "data"),
+        [Input(f"tab-{i}-link", "active") for i in range(5)],
+        State("mounted-tabs", "data"),
+        State("play-button", "style"),
+        State("map-play-button", "style"),
+    )
 
+    # Build the pane of a tab on its first visit only
+    @app.callback(
+        [Output(f"tab-pane-{i}", "children") for i in range(5)],
+        Input("mounted-tabs", "data"),
+        prevent_initial_call=True,
+    )
+    def render_tab_pane(mounted):
+        tab = mounted[-1]
+        builder = TAB_BUILDERS[tab]
+        pane = builder(shared_controls=True) if tab in SHARED_CONTROL_TABS else builder()
+        return [pane if i == tab else no_update for i in range(5)]
 
-# Add callback to toggle navbar
-@callback(
+else:
+    # Callback to update tab content
+    @app.callback(
+        Output("tab-content", "children"),
+        [Input(f"tab-{i}-link", "active") for i in range(5)],
+        [State("tab-store", "data")],
+    )
+    def render_tab_content(*active_tabs):
+        ctx = dash.callback_context
+        if not ctx.triggered:
+            return create_introduction_tab()
+
+        for i, is_active in enumerate(active_tabs):
+            if is_active:
+                return TAB_BUILDERS[i]()
+
+        return "No tab selected"
+
+
+# Add callback to toggle navbar, run in the browser
+app.clientside_callback(
+    """
+    function(n, isOpen) {
+        return n ? !isOpen : isOpen;
+    }
+    """,
     Output("navbar-collapse", "is_open"),
     [Input("navbar-toggler", "n_clicks")],
     [State("navbar-collapse", "is_open")],
 )
-def toggle_navbar_collapse(n, is_open):
-    if n:
-        return not is_open
-    return is_open
 
 
 # Register chatbot callbacks
 chatbot.register_callbacks(app)
 
 if __name__ == "__main__":
+    start_reloader()
+    start_warmup()
     app.run_server(
         debug=True,
         host="0.0.0.0",
@@ -0,0 +1,87 @@
+"""Check that server-side callbacks are the ones that need the server.
+
+A callback that only maps its inputs to outputs (toggling, relabelling, moving a slider)
+still costs a request and a worker slot when it runs server-side; it belongs in a
+``clientside_callback``. :func:`audit_callbacks` lists server callbacks whose function
+reaches nothing of the app's own code: no data access, no figure or layout builder and
+no closure over app state.
+
+Run ``python -m components.callback_audit`` to check the whole app; it exits with
+status 1 when it finds such a callback, and ``tests/test_callback_audit.py`` runs the
+same check under pytest. Callbacks that must stay server-side anyway can
+be listed in ``ALLOWED_SERVER_CALLBACKS``.
+"""
+
+import inspect
+import sys
+from types import CodeType
+
+from dash._callback import GLOBAL_CALLBACK_MAP
+
+# Top-level packages whose objects mean a callback depends on server-side state
+APP_MODULES = ("components", "application")
+
+# Qualified names of pure callbacks that are kept server-side on purpose
+ALLOWED_SERVER_CALLBACKS = set()
+
+
+def _names(code):
+    """Yield the global names used by a code object and the code nested in it."""
+    yield from code.co_names
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            yield from _names(const)
+
+
+def _is_app_object(value) -> bool:
+    if value is None:
+        return False
+    owner = value.__name__ if inspect.ismodule(value) else getattr(value, "__module__", None)
+    return bool(owner) and owner.split(".")[0] in APP_MODULES
+
+
+def uses_app_code(func) -> bool:
+    """Return True when a callback function refers to the app's own modules or state."""
+    func = inspect.unwrap(func)
+    if func.__closure__:
+        return True
+    for name in set(_names(func.__code__)):
+        value = func.__globals__.get(name)
+        # Look into lookup tables too, e.g. a dict of layout builders
+        values = value.values() if isinstance(value, dict) else [value]
+        if any(_is_app_object(v) for v in values):
+            return True
+    return False
+
+
+def audit_callbacks(app=None) -> list[str]:
+    """Return a description of every pure server-side callback.
+
+    Args:
+        app (dash.Dash, optional): App whose ``app.callback`` callbacks are checked too;
+            callbacks registered with ``dash.callback`` are always checked
+    """
+    callback_map = dict(GLOBAL_CALLBACK_MAP)
+    if app is not None:
+        callback_map.update(app.callback_map)
+
+    findings = []
+    for output, spec in callback_map.items():
+        func = spec.get("callback")
+        if func is None:
+            continue
+        unwrapped = inspect.unwrap(func)
+        name = f"{unwrapped.__module__}.{unwrapped.__qualname__}"
+        if name in ALLOWED_SERVER_CALLBACKS or uses_app_code(func):
+            continue
+        findings.append(f"{name} -> {output}")
+    return sorted(findings)
+
+
+if __name__ == "__main__":
+    from application import app
+
+    findings = audit_callbacks(app)
+    for finding in findings:
+        print(f"Callback could run clientside: {finding}")
+    sys.exit(1 if findings else 0)
@@ -0,0 +1,75 @@
+"""Counts of Dash callback requests per output, to measure round trips per interaction.
+
+Every browser-to-server callback is a POST to ``_dash-update-component`` naming the
+outputs it updates. With ``CALLBACK_STATS=1``, :func:`register_callback_stats` counts
+those requests in each worker and serves the counts as JSON at ``/stats/callbacks``
+(``?reset=1`` clears them after reading). The hit and miss counts of the filter stage
+caches are served at ``/stats/filter-stages`` and the prefetch counts and store callback
+latencies at ``/stats/prefetch``.
+"""
+
+import os
+import threading
+from collections import Counter
+
+from flask import jsonify, request
+
+CALLBACK_STATS = os.getenv("CALLBACK_STATS", "0") == "1"
+
+UPDATE_PATH = "_dash-update-component"
+
+
+class CallbackStats:
+    """Thread-safe request counter keyed by the callback's output string."""
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, output):
+        with self._lock:
+            self._counts[output] += 1
+
+    def snapshot(self, reset=False) -> dict:
+        """Return the total and per-output request counts."""
+        with self._lock:
+            counts = dict(self._counts)
+            if reset:
+                self._counts.clear()
+        return {"requests": sum(counts.values()), "outputs": counts}
+
+
+STATS = CallbackStats()
+
+
+def _record_request():
+    if request.method != "POST" or not request.path.endswith(UPDATE_PATH):
+        return
+    body = request.get_json(silent=True) or {}
+    STATS.record(body.get("output", "unknown"))
+
+
+def _stats_view():
+    return jsonify(STATS.snapshot(reset=request.args.get("reset") == "1"))
+
+
+def _filter_stages_view():
+    from components.data.data import stage_stats
+
+    return jsonify(stage_stats())
+
+
+def _prefetch_view():
+    from components.data.data import PREFETCHER
+
+    return jsonify(PREFETCHER.stats())
+
+
+def register_callback_stats(server, enabled=CALLBACK_STATS):
+    """Count callback requests on the Flask ``server`` and expose the counts."""
+    if not enabled:
+        return
+    server.before_request(_record_request)
+    server.add_url_rule("/stats/callbacks", "callback_stats", _stats_view)
+    server.add_url_rule("/stats/filter-stages", "filter_stage_stats", _filter_stages_view)
+    server.add_url_rule("/stats/prefetch", "prefetch_stats", _prefetch_view)
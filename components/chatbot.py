@@ -240,15 +240,18 @@ Remember: Your role is to analyze and present the data accurately, not to provid
         )
 
     def register_callbacks(self, app):
-        @app.callback(
+        # Show or hide the chat window in the browser
+        app.clientside_callback(
+            """
+            function(n_clicks, currentStyle) {
+                const display = n_clicks % 2 === 1 ? "block" : "none";
+                return Object.assign({}, currentStyle, {display: display});
+            }
+            """,
             Output("chat-container", "style"),
             Input("chat-button", "n_clicks"),
             State("chat-container", "style"),
         )
-        def toggle_chatbot(n_clicks, current_style):
-            if n_clicks % 2 == 1:
-                return {**current_style, "display": "block"}
-            return {**current_style, "display": "none"}
 
         @app.callback(
             Output("chat-history", "children"),
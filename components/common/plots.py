@@ -3,7 +3,7 @@
 import dash_bootstrap_components as dbc
 from dash import html
 
-from components.data.data import data
+from components.data.data import get_dataset
 from components.visualisations import create_bar_plot, create_line_plot, create_scatter_plot
 
 
@@ -29,7 +29,9 @@ def create_plot_grid(df, col, selected_countries, top_n):
             create_bar_plot(col, df, top_n=top_n), width=6, className="px-2 py-2"
         ),
         "pop_line": dbc.Col(
-            create_line_plot("Population", data, countries=selected_countries, top_n=top_n),
+            create_line_plot(
+                "Population", get_dataset().data, countries=selected_countries, top_n=top_n
+            ),
             width=6,
             className="px-2 py-2",
         ),
@@ -1,9 +1,51 @@
 import dash_bootstrap_components as dbc
-from dash import Input, Output, State, callback, dcc, html
+from dash import Input, Output, State, clientside_callback, dcc, html
 
 
-def create_year_slider(min_year=1980, max_year=2021, default=2021):
-    """Generate marks for the slider using a dictionary comprehension"""
+def create_play_button(client_playback=False):
+    """Play button and the interval it starts
+
+    With ``client_playback`` the play button and interval get their own ids so playback
+    can run in the browser (see ``components/tabs/world_map.py``) instead of moving the
+    slider through the server every tick.
+    """
+    play_id, interval_id = (
+        ("map-play-button", "map-playback-interval")
+        if client_playback
+        else ("play-button", "animation-interval")
+    )
+    return [
+        html.Button(
+            "▶️",
+            id=play_id,
+            n_clicks=0,
+            style={
+                "border": "none",
+                "background": "none",
+                "font-size": "20px",
+                "cursor": "pointer",
+            },
+        ),
+        dcc.Interval(
+            id=interval_id,
+            # 5 second between frames, 1 second when they are
+            # drawn in the browser without a round trip
+            interval=1000 if client_playback else 5000,
+            disabled=True,
+        ),
+    ]
+
+
+def create_year_slider(
+    min_year=1980, max_year=2021, default=2021, client_playback=False, play_controls=None
+):
+    """Generate marks for the slider using a dictionary comprehension
+
+    ``play_controls`` replaces the play button of :func:`create_play_button`, e.g. with
+    both play buttons when the slider is shared by every tab.
+    """
+    if play_controls is None:
+        play_controls = create_play_button(client_playback)
     marks = {
         str(year): str(year) for year in range(min_year, max_year + 1, 10)  # Increased interval
     }
@@ -13,24 +55,7 @@ def create_year_slider(min_year=1980, max_year=2021, default=2021):
             dbc.Row(
                 [
                     dbc.Col(
-                        [
-                            html.Button(
-                                "▶️",
-                                id="play-button",
-                                n_clicks=0,
-                                style={
-                                    "border": "none",
-                                    "background": "none",
-                                    "font-size": "20px",
-                                    "cursor": "pointer",
-                                },
-                            ),
-                            dcc.Interval(
-                                id="animation-interval",
-                                interval=5000,  # 5 second between frames
-                                disabled=True,
-                            ),
-                        ],
+                        play_controls,
                         width=1,
                     ),
                     dbc.Col(
@@ -56,29 +81,36 @@ def create_year_slider(min_year=1980, max_year=2021, default=2021):
 
 
 # callback functions
-@callback(
+# Start or stop the animation in the browser
+clientside_callback(
+    """
+    function(n_clicks, disabled) {
+        if (n_clicks) {
+            return [!disabled, disabled ? "⏸️" : "▶️"];
+        }
+        return [true, "▶️"];
+    }
+    """,
     Output("animation-interval", "disabled"),
     Output("play-button", "children"),
     Input("play-button", "n_clicks"),
     State("animation-interval", "disabled"),
 )
-def toggle_animation(n_clicks, disabled):
-    """Function to add a toggle animation the sidebar"""
-    if n_clicks:
-        return not disabled, "⏸️" if disabled else "▶️"
-    return True, "▶️"
 
 
-@callback(
+# Advance the year slider on every tick, in the browser
+clientside_callback(
+    """
+    function(n_intervals, currentYear, minYear, maxYear) {
+        if (currentYear === null || currentYear === undefined) {
+            return minYear;
+        }
+        return currentYear < maxYear ? currentYear + 1 : minYear;
+    }
+    """,
     Output("year-slider", "value"),
     Input("animation-interval", "n_intervals"),
     State("year-slider", "value"),
     State("year-slider", "min"),
     State("year-slider", "max"),
 )
-def update_year_on_interval(n_intervals, current_year, min_year, max_year):
-    """Function to update the year slider"""
-    if current_year is None:
-        return min_year
-    next_year = current_year + 1 if current_year < max_year else min_year
-    return next_year
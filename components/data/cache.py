@@ -0,0 +1,168 @@
+"""Byte-bounded LRU caches for the data callbacks.
+
+The dataset never changes in place, so cached results stay valid until it is reloaded;
+every key carries the dataset version and the caches are cleared on reload. What needs
+bounding is memory, so :class:`SizedLRUCache` limits the estimated bytes of its values
+instead of their count and evicts the least recently used entries first.
+
+:func:`cached` is a thread-safe, single-flight version of ``cachetools.cached``: when
+several requests ask for the same missing key at once, the first one computes the value
+and the others wait for it instead of computing it again.
+
+With ``STALE_WHILE_REVALIDATE=1``, caches given a ``stale_key`` also keep the last good
+value under a key that ignores the dataset version. After a reload the old value is
+served at once while the new one is computed in a background thread.
+"""
+
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import polars as pl
+from cachetools import LRUCache
+from cachetools.keys import hashkey
+
+logger = logging.getLogger(__name__)
+
+# Byte budget of each data cache, in MiB
+DATA_CACHE_MB = float(os.getenv("DATA_CACHE_MB", "32"))
+
+STALE_WHILE_REVALIDATE = os.getenv("STALE_WHILE_REVALIDATE", "0") == "1"
+
+# Threads are only started on the first refresh, so none exist in a preloading master
+_REFRESH_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+
+_MISSING = object()
+
+
+def size_of(value) -> int:
+    """Estimate the bytes held by a cached value.
+
+    Frames report their buffer sizes, store payloads their JSON length and tuples the sum
+    of their items.
+    """
+    if isinstance(value, pl.DataFrame):
+        return value.estimated_size()
+    if isinstance(value, tuple):
+        return sum(size_of(item) for item in value)
+    if isinstance(value, (dict, list)):
+        return len(json.dumps(value, separators=(",", ":"), default=str))
+    return sys.getsizeof(value)
+
+
+class SizedLRUCache(LRUCache):
+    """LRU cache bounded by the estimated size of its values in bytes.
+
+    Values larger than the whole budget are not cached.
+    """
+
+    def __init__(self, maxbytes=None):
+        if maxbytes is None:
+            maxbytes = int(DATA_CACHE_MB * 1024 * 1024)
+        super().__init__(maxsize=maxbytes, getsizeof=size_of)
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "waits", "stale", "maxsize", "currsize"])
+
+
+def cached(cache, key=hashkey, stale_key=None):
+    """Decorator to wrap a function with a thread-safe, single-flight memoizing cache.
+
+    Works like ``cachetools.cached(cache, key, lock)``, but concurrent calls with the same
+    key share one computation; ``waits`` counts the calls that joined another's. An
+    exception is raised in every waiting call and nothing is cached.
+
+    Args:
+        cache: The cache holding current values
+        key: Function of the call arguments returning the cache key
+        stale_key (optional): Function of the call arguments returning a key that
+            outlives ``cache_clear``; enables stale-while-revalidate when
+            ``STALE_WHILE_REVALIDATE`` is set. ``stale`` counts the stale values served.
+    """
+    lock = threading.Lock()
+    pending = {}
+    counts = {"hits": 0, "misses": 0, "waits": 0, "stale": 0}
+    stale = None
+    if stale_key is not None and STALE_WHILE_REVALIDATE:
+        stale = LRUCache(maxsize=cache.maxsize, getsizeof=cache.getsizeof)
+
+    def decorator(func):
+        def compute(k, sk, flight, args, kwargs):
+            try:
+                value = func(*args, **kwargs)
+            except BaseException as exc:
+                with lock:
+                    pending.pop(k, None)
+                flight.set_exception(exc)
+                raise
+            with lock:
+                try:
+                    cache[k] = value
+                    if stale is not None:
+                        stale[sk] = value
+                except ValueError:
+                    pass  # value too large
+                pending.pop(k, None)
+            flight.set_result(value)
+            return value
+
+        def refresh(k, sk, flight, args, kwargs):
+            try:
+                compute(k, sk, flight, args, kwargs)
+            except Exception:
+                logger.exception("Background refresh of %s failed", func.__qualname__)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            k = key(*args, **kwargs)
+            sk = stale_key(*args, **kwargs) if stale is not None else None
+            with lock:
+                try:
+                    value = cache[k]
+                except KeyError:
+                    pass
+                else:
+                    counts["hits"] += 1
+                    return value
+                flight = pending.get(k)
+                leader = flight is None
+                if leader:
+                    flight = pending[k] = Future()
+                    counts["misses"] += 1
+                else:
+                    counts["waits"] += 1
+                previous = stale.get(sk, _MISSING) if stale is not None else _MISSING
+                if previous is not _MISSING:
+                    counts["stale"] += 1
+
+            if previous is not _MISSING:
+                if leader:
+                    _REFRESH_EXECUTOR.submit(refresh, k, sk, flight, args, kwargs)
+                return previous
+            if not leader:
+                return flight.result()
+            return compute(k, sk, flight, args, kwargs)
+
+        def cache_clear():
+            """Clear the current values; stale values are kept to serve while refreshing."""
+            with lock:
+                cache.clear()
+                counts.update(hits=0, misses=0, waits=0, stale=0)
+
+        def cache_info():
+            with lock:
+                return CacheInfo(maxsize=cache.maxsize, currsize=cache.currsize, **counts)
+
+        wrapper.cache = cache
+        wrapper.cache_key = key
+        wrapper.cache_lock = lock
+        wrapper.cache_clear = cache_clear
+        wrapper.cache_info = cache_info
+        return wrapper
+
+    return decorator
@@ -1,15 +1,26 @@
 #! usr/bin/env python3
 import logging
-import os
+import threading
+import time
 from functools import lru_cache
 
+import numpy as np
 import pandas as pd
 import polars as pl
-from cachetools import TTLCache, cached
 from cachetools.keys import hashkey
-from dash import Input, Output, callback
+from dash import Input, Output, State, callback, ctx, no_update
 
 from components.common.gender_metric_selector import get_metric_column
+from components.data import snapshot
+from components.data.cache import SizedLRUCache, cached
+from components.data.dataset import Dataset
+from components.data.encoding import Dictionary, encode_dimensions
+from components.data.index import EntityIndex, build_partition_index
+from components.data.payload import FLOAT_PRECISION, encode_frame
+from components.data.prefetch import Prefetcher
+from components.data.query import run_query
+from components.data.store import publish
+from components.data.warmup import record_selection
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +29,9 @@ def make_hashable(value):
     """Convert unhashable types (lists) to hashable ones (tuples) for caching."""
     if isinstance(value, list):
         return tuple(sorted(value))
+    if isinstance(value, Dataset):
+        # Results derived from a dataset are keyed by its version, not the object
+        return ("dataset", value.version)
     return value
 
 
@@ -28,219 +42,632 @@ def cache_key(*args, **kwargs):
     )
 
 
-@cached(cache=TTLCache(maxsize=128, ttl=300), key=cache_key)
+def unversioned_key(dataset, *args, **kwargs):
+    """Cache key of a result computed from ``dataset`` that ignores its version."""
+    return cache_key(*args, **kwargs)
+
+
 def load_data():
-    """Load data with caching using Polars."""
+    """Load data using Polars.
+
+    Memory-maps the prebuilt Arrow snapshot when it is up to date and falls back to
+    parsing the CSV otherwise. The result is kept by the :class:`Dataset` that loaded it,
+    so a reload always reads the files again.
+    """
     # logger.debug("Cache info for load_data: %s", load_data.cache_info())
-    data_path = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "heart_processed.csv"
+    start = time.perf_counter()
+    df, source = snapshot.load_table(snapshot.CSV_PATH, snapshot.SNAPSHOT_PATH)
+    # Snapshots written before the dimension columns were encoded still need the casts
+    df = encode_dimensions(df)
+
+    logger.info(
+        "Loaded data shape: %s from %s in %.3fs", df.shape, source, time.perf_counter() - start
     )
-    df = pl.read_csv(data_path)
-    # Pre-process data once during loading: convert Year to integer
-    df = df.with_columns(pl.col("Year").cast(pl.Int32))
-
-    # Convert numeric columns to efficient types, skipping WB_Income
-    schema = df.schema
-    float_cols = [col for col, typ in schema.items() if typ == pl.Float64 and col != "WB_Income"]
-    for col in float_cols:
-        df = df.with_columns(pl.col(col).cast(pl.Float32))
-    # Handle WB_Income column
-    df = df.with_columns(pl.col("WB_Income").fill_null("Unknown").cast(pl.Utf8))
-
-    logger.info("Loaded data shape: %s", df.shape)
     return df
 
 
-# Load data once at module level
-data = load_data()
+def load_trends():
+    """Load the trends table from its snapshot, or its CSV as a fallback."""
+    start = time.perf_counter()
+    df, source = snapshot.load_table(
+        snapshot.TRENDS_CSV_PATH, snapshot.TRENDS_SNAPSHOT_PATH, snapshot.read_trends_csv
+    )
+    logger.info(
+        "Loaded trends shape: %s from %s in %.3fs", df.shape, source, time.perf_counter() - start
+    )
+    return df
+
+
+def build_trends_payloads(trends):
+    """Pre-shape the trends store payload of every metric column.
+
+    Each payload keeps the metric next to ``is_projection`` so the trend plot can split
+    actual and projected years without any work in the callback.
+    """
+    keep_cols = [col for col in ["cause", "age", "Year"] if col in trends.columns]
+    split_cols = ["is_projection"] if "is_projection" in trends.columns else []
+    return {
+        col: encode_frame(trends.select(keep_cols + [col] + split_cols))
+        for col in trends.columns
+        if col.startswith("val")
+    }
+
+
+@Dataset.member("indexed_data")
+def _build_indexed_data(ds):
+    """Load the data and index its (Year, age, cause) partitions."""
+    return build_partition_index(load_data())
+
+
+@Dataset.member("data")
+def _build_data(ds):
+    return ds.indexed_data[0]
+
+
+@Dataset.member("partition_index")
+def _build_partition_index(ds):
+    return ds.indexed_data[1]
+
+
+@Dataset.member("dictionary")
+def _build_dictionary(ds):
+    """Encoded categories shared by the filters and the unique value lists."""
+    return Dictionary(ds.data)
+
+
+@Dataset.member("cardiovascular")
+def _build_cardiovascular(ds):
+    return ds.dictionary.resolve("cause", "Cardiovascular diseases")
+
+
+@Dataset.member("entity_index")
+def _build_entity_index(ds):
+    """Per-country series and cause rankings answering the map tooltips."""
+    cardiovascular = ds.dictionary.matching(
+        "cause", lambda cause: "cardiovascular diseases" in cause.lower()
+    )
+    return EntityIndex(ds.data, cardiovascular)
+
+
+@Dataset.member("unique_regions")
+def _build_unique_regions(ds):
+    return list(ds.dictionary.categories["region"])
+
+
+@Dataset.member("unique_incomes")
+def _build_unique_incomes(ds):
+    return list(ds.dictionary.categories["WB_Income"])
+
+
+@Dataset.member("unique_entities")
+def _build_unique_entities(ds):
+    return list(ds.dictionary.categories["Entity"])
+
+
+@Dataset.member("unique_ages")
+def _build_unique_ages(ds):
+    return list(ds.dictionary.categories["age"])
+
+
+@Dataset.member("metrics")
+def _build_metrics(ds):
+    return list(ds.dictionary.categories["cause"])
+
+
+@Dataset.member("year_range")
+def _build_year_range(ds):
+    return (int(ds.data["Year"].min()), int(ds.data["Year"].max()))
+
+
+@Dataset.member("value_columns")
+def _build_value_columns(ds):
+    return [col for col in ds.data.columns if col.startswith("val")]
+
+
+@Dataset.member("region_countries")
+def _build_region_countries(ds):
+    """Region to countries mapping, built in a single pass."""
+    return {
+        region: countries
+        for region, countries in ds.data.drop_nulls(subset=["region"])
+        .group_by("region")
+        .agg(pl.col("Entity").unique().sort().cast(pl.Utf8))
+        .iter_rows()
+    }
+
+
+@Dataset.member("data_2019")
+def _build_data_2019(ds):
+    return query_data(
+        year=2019,
+        age="Age-standardized",
+        cause="Cardiovascular diseases",
+        casts={
+            col: pl.Float64
+            for col in ["t_htn_ctrl", "t_high_bp_30-79", "t_htn_diag", "t_htn_rx_30-79"]
+        },
+        dataset=ds,
+    )
 
-# Pre-calculate unique values for filters
-UNIQUE_REGIONS = sorted(data["region"].drop_nulls().unique())
-UNIQUE_INCOMES = sorted(data["WB_Income"].drop_nulls().unique())
-UNIQUE_ENTITIES = sorted(data["Entity"].unique())
-UNIQUE_AGES = sorted(data["age"].unique())
-YEAR_RANGE = (int(data["Year"].min()), int(data["Year"].max()))
-METRICS = sorted(data["cause"].unique())
 
-# Pre-calculate region to countries mapping
-REGION_COUNTRIES = {
-    region: sorted(data.filter(pl.col("region") == region)["Entity"].unique())
-    for region in UNIQUE_REGIONS
+@Dataset.member("risk_correlations")
+def _build_risk_correlations(ds):
+    """Correlation matrix of the risk factors and each metric column, keyed by the column.
+
+    The healthcare panel always shows 2019, age-standardized cardiovascular data, so every
+    matrix is computed once here instead of on each render.
+    """
+    correlations = {}
+    for col in ds.value_columns:
+        df = query_data(
+            year=2019,
+            age="Age-standardized",
+            cause="Cardiovascular diseases",
+            columns=RISK_COLUMNS + [col],
+            casts={risk_col: pl.Float64 for risk_col in RISK_COLUMNS},
+            drop_nulls=RISK_COLUMNS + [col],
+            dataset=ds,
+        )
+        correlations[col] = df.corr()
+    return correlations
+
+
+@Dataset.member("trends_payloads")
+def _build_trends_payloads(ds):
+    """Trends store payloads keyed by metric column."""
+    return build_trends_payloads(load_trends())
+
+
+# Nothing is loaded until a member is first read; see get_dataset() and reload_dataset()
+_DATASET = Dataset(signature=snapshot.source_signature())
+_RELOAD_LOCK = threading.Lock()
+
+# Module attributes that used to be built at import, mapped to their dataset members
+_LEGACY_GLOBALS = {
+    "data": "data",
+    "PARTITION_INDEX": "partition_index",
+    "DICTIONARY": "dictionary",
+    "CARDIOVASCULAR": "cardiovascular",
+    "UNIQUE_REGIONS": "unique_regions",
+    "UNIQUE_INCOMES": "unique_incomes",
+    "UNIQUE_ENTITIES": "unique_entities",
+    "UNIQUE_AGES": "unique_ages",
+    "YEAR_RANGE": "year_range",
+    "METRICS": "metrics",
+    "REGION_COUNTRIES": "region_countries",
+    "VALUE_COLUMNS": "value_columns",
+    "TRENDS_PAYLOADS": "trends_payloads",
+    "data_2019": "data_2019",
 }
 
 
-@cached(cache=TTLCache(maxsize=32, ttl=300), key=cache_key)
-def filter_data(
-    year=None, regions=None, income=None, gender="Both", metric=None, age=None, cause=None
-):
-    """Base filter function for filtering data based on various criteria."""
-    filtered = data
-    if year:
-        filtered = data.filter(pl.col("Year") == year)
-    if regions and regions != ["All"]:
-        filtered = filtered.filter(pl.col("region").is_in(regions))
-    if income and income != "All":
-        filtered = filtered.filter(pl.col("WB_Income") == str(income))
-    if age:
-        filtered = filtered.filter(pl.col("age") == age)
+def get_dataset():
+    """Return the active dataset; its members are built on first access.
+
+    Callbacks read it once and pass it on, so a reload that lands mid-request does not mix
+    two versions in one response.
+    """
+    return _DATASET
+
+
+def reload_dataset(force=False):
+    """Load the dataset again when its source files changed and swap it in atomically.
+
+    The new dataset is fully built before it replaces the active one, so requests see
+    either the old version or the complete new one. Requests already running keep the
+    dataset they started with. Caches of derived results are cleared on swap; their keys
+    also carry the dataset version.
+
+    Args:
+        force (bool, optional): Reload even when the source files look unchanged
+
+    Returns:
+        Dataset: The new dataset, or None when nothing changed
+    """
+    global _DATASET
+    with _RELOAD_LOCK:
+        current = _DATASET
+        signature = snapshot.source_signature()
+        if not force and signature == current.signature:
+            return None
+        start = time.perf_counter()
+        snapshot.refresh_copies()
+        fresh = Dataset(version=current.version + 1, signature=signature)
+        fresh.build_all()
+        _DATASET = fresh
+        clear_derived_caches()
+        logger.info(
+            "Swapped dataset v%s for v%s in %.3fs",
+            current.version,
+            fresh.version,
+            time.perf_counter() - start,
+        )
+        return fresh
+
+
+def clear_derived_caches():
+    """Drop every cached result computed from a previous dataset version."""
+    derived = (filtered_payloads, playback_frames, metric_bins, metric_ranking)
+    for func in (*FILTER_STAGES.values(), *derived):
+        func.cache_clear()
+
+
+def __getattr__(name):
+    """Build the old module-level globals on first access instead of at import."""
+    if name in _LEGACY_GLOBALS:
+        return getattr(get_dataset(), _LEGACY_GLOBALS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def startup_report():
+    """Return the build time in seconds of every dataset member built so far."""
+    return dict(get_dataset().timings)
+
+
+def initialize():
+    """Build the dataset and all of its lookups now rather than on the first request."""
+    return get_dataset().build_all()
+
+
+def partition(year=None, age=None, cause=None, dataset=None):
+    """Return the rows for a (year, age, cause) selection.
+
+    With a year the rows come from the partition index as a zero-copy slice; only the
+    cause is still filtered when it is given without an age. Ages and causes that are not
+    in the dictionary select no rows.
+    """
+    ds = dataset or get_dataset()
+    data = ds.data
+    resolved_age = ds.dictionary.resolve("age", age)
+    resolved_cause = ds.dictionary.resolve("cause", cause)
+    if (age and resolved_age is None) or (cause and resolved_cause is None):
+        return data.clear()
+    age, cause = resolved_age, resolved_cause
+
+    if not year:
+        filtered = data
+        if age:
+            filtered = filtered.filter(pl.col("age") == age)
+    else:
+        filtered = ds.partition_index.slice(data, year, age, cause)
+        if age:
+            return filtered
     if cause:
         filtered = filtered.filter(pl.col("cause") == cause)
-
-    if metric and gender:
-        col = get_metric_column(gender, metric)
-        if col:
-            filtered = filtered.drop_nulls(subset=[col])
-    logger.debug(msg=f"columns: {filtered.columns}")
     return filtered
 
 
-data_2019 = (
-    filter_data(year=2019, age="Age-standardized", cause="Cardiovascular diseases")
-    .with_columns(pl.col("t_htn_ctrl").cast(pl.Float64, strict=False))
-    .with_columns(pl.col("t_high_bp_30-79").cast(pl.Float64, strict=False))
-    .with_columns(pl.col("t_htn_diag").cast(pl.Float64, strict=False))
-    .with_columns(pl.col("t_htn_rx_30-79").cast(pl.Float64, strict=False))
-)
-print(data_2019.head())
+# The filter pipeline runs in ordered stages, each cached on its own arguments plus those
+# of the stages before it. Changing a downstream argument (the countries or the metric)
+# reuses the cached upstream stages; stage_stats() reports the hits and misses per stage.
+@cached(cache=SizedLRUCache(), key=cache_key)
+def partition_stage(dataset, year, age, cause):
+    """Stage 1: the rows of one (year, age, cause) partition."""
+    return partition(year, age, cause, dataset=dataset)
+
+
+@cached(cache=SizedLRUCache(), key=cache_key)
+def region_income_stage(dataset, year, age, cause, regions, income):
+    """Stage 2: the partition restricted to the selected regions and income group."""
+    frame = partition_stage(dataset, year, age, cause)
+    predicates = []
+    if regions:
+        predicates.append(dataset.dictionary.isin("region", regions))
+    if income:
+        predicates.append(dataset.dictionary.match("WB_Income", income))
+    return run_query(frame, predicates) if predicates else frame
+
+
+@cached(cache=SizedLRUCache(), key=cache_key)
+def country_stage(dataset, year, age, cause, regions, income, countries):
+    """Stage 3: the selected countries."""
+    frame = region_income_stage(dataset, year, age, cause, regions, income)
+    if not countries:
+        return frame
+    return run_query(frame, [dataset.dictionary.isin("Entity", countries)])
+
+
+@cached(cache=SizedLRUCache(), key=cache_key)
+def metric_stage(dataset, year, age, cause, regions, income, countries, col):
+    """Stage 4: rows with a value for the metric column."""
+    frame = country_stage(dataset, year, age, cause, regions, income, countries)
+    return run_query(frame, drop_nulls=[col])
+
+
+FILTER_STAGES = {
+    "partition": partition_stage,
+    "region_income": region_income_stage,
+    "country": country_stage,
+    "metric": metric_stage,
+}
 
 
-@callback(
-    Output("geo-eco-data", "data"),
-    Input("year-slider", "value"),
-    Input("region-dropdown", "value"),
-    Input("income-dropdown", "value"),
-    Input("gender-dropdown", "value"),
-    Input("metric-dropdown", "value"),
-    Input("age-dropdown", "value"),
-    Input("country-dropdown", "value"),
-)
-@cached(cache=TTLCache(maxsize=32, ttl=300), key=cache_key)
-def get_geo_eco_data(year, regions, income, gender, metric, age, country):
-    """Get filtered data for geo-economic visualizations."""
+def stage_arguments(year, regions, income, age, cause, countries, dataset=None):
+    """Normalize filter arguments into the leading arguments shared by every stage.
 
-    if not year or not gender or not metric:
-        return []
+    "All" regions or income and an empty country list select everything, so they share
+    their cache entries with no selection.
+    """
+    return (
+        dataset or get_dataset(),
+        year,
+        age,
+        cause,
+        None if not regions or regions == ["All"] else regions,
+        None if not income or income == "All" else income,
+        countries or None,
+    )
+
+
+def stage_stats():
+    """Return hits, misses, single-flight waits and size of every filter stage cache."""
+    return {name: stage.cache_info()._asdict() for name, stage in FILTER_STAGES.items()}
 
-    cols = [get_metric_column(g, metric) for g in ["Both", "Female", "Male"]]
-    cols = [col for col in cols if col]
 
-    df = filter_data(
-        year, regions, income, gender, metric, age=age, cause="Cardiovascular diseases"
+@cached(cache=SizedLRUCache(), key=cache_key)
+def metric_ranking(dataset, year, age, cause, col):
+    """Countries of one (year, age, cause) partition sorted by ``col``, highest first.
+
+    Returns a frame of ``Entity``, ``col`` and ``rank`` (1 for the highest value; ties
+    share a rank). Top-N charts take their countries from it, so moving the top-N slider
+    never sorts again, and tooltips read a country's rank from it. Without an ``age`` the
+    partition holds every age group and countries repeat, so callers pass one.
+    """
+    return (
+        partition_stage(dataset, year, age, cause)
+        .select(pl.col("Entity").cast(pl.Utf8), pl.col(col).cast(pl.Float64))
+        .drop_nulls(subset=[col])
+        .sort(col, descending=True, maintain_order=True)
+        .with_columns(pl.col(col).rank("min", descending=True).cast(pl.UInt32).alias("rank"))
     )
-    if country:
-        df = df.filter(pl.col("Entity").is_in(country))
-
-    if cols:
-        keep_cols = [
-            "Entity",
-            "Year",
-            "Code",
-            "gdp_pc",
-            "WB_Income",
-            "Population",
-            "region",
-            "cause",
-        ] + cols
-        df = df.select(keep_cols)
-        df = df.with_columns(
-            [pl.col(col).cast(pl.Float32) for col in cols + ["gdp_pc", "Population"]]
-        )
-        df = df.drop_nulls(subset=cols + ["gdp_pc", "Population"])
 
-    return df.to_dicts()
+
+def query_data(
+    year=None,
+    regions=None,
+    income=None,
+    age=None,
+    cause=None,
+    countries=None,
+    columns=None,
+    casts=None,
+    drop_nulls=None,
+    dataset=None,
+):
+    """Query the filtered rows of one partition, projecting only the columns needed.
+
+    The row filters come from the cached filter stages. Callbacks declare the columns,
+    casts and null-drops they need so only those columns are copied into the result; see
+    :func:`components.data.query.run_query`.
+    """
+    frame = country_stage(*stage_arguments(year, regions, income, age, cause, countries, dataset))
+    return run_query(frame, (), columns, casts, drop_nulls)
+
+
+def filter_data(
+    year=None,
+    regions=None,
+    income=None,
+    gender="Both",
+    metric=None,
+    age=None,
+    cause=None,
+    countries=None,
+    dataset=None,
+):
+    """Base filter function for filtering data based on various criteria."""
+    col = get_metric_column(gender, metric) if metric and gender else None
+    args = stage_arguments(year, regions, income, age, cause, countries, dataset)
+    return metric_stage(*args, col) if col else country_stage(*args)
+
+
+# Columns each data callback keeps besides its metric columns
+ID_COLUMNS = ["Entity", "Code", "region", "WB_Income", "Year", "cause"]
+GEO_ECO_COLUMNS = [
+    "Entity",
+    "Year",
+    "Code",
+    "gdp_pc",
+    "WB_Income",
+    "Population",
+    "region",
+    "cause",
+]
+RISK_COLUMNS = ["obesity%", "t_htn_ctrl", "t_high_bp_30-79", "pacemaker_1m", "t_htn_diag"]
 
 
 @callback(
     Output("world-map-data", "data"),
+    Output("geo-eco-data", "data"),
+    Output("healthcare-data", "data"),
     Input("year-slider", "value"),
     Input("region-dropdown", "value"),
     Input("income-dropdown", "value"),
     Input("gender-dropdown", "value"),
     Input("metric-dropdown", "value"),
     Input("age-dropdown", "value"),
+    Input("country-dropdown", "value"),
 )
-def get_world_map_data(year, regions, income, gender, metric, age):
-    """Get filtered data for world map visualization."""
-    if not year or not metric or not gender:
-        return []
+def get_filtered_data(year, regions, income, gender, metric, age, country):
+    """Fill the world map, geo-economic and healthcare stores from one filtered slice.
+
+    The three stores share their filters, so one request filters the partition once and
+    each store is derived from that slice. The world map ignores the country selection
+    and is left untouched when only the countries changed.
+    """
+    if not year:
+        return [], [], []
+    record_selection(year, regions, income, gender, metric, age, country)
+    world_map, geo_eco, healthcare = PREFETCHER.serve(
+        get_dataset(), year, regions, income, gender, metric, age, country
+    )
+    if ctx.triggered_id == "country-dropdown":
+        world_map = no_update
+    else:
+        world_map = publish(world_map)
+    return world_map, publish(geo_eco), publish(healthcare)
+
+
+@cached(cache=SizedLRUCache(), key=cache_key, stale_key=unversioned_key)
+def filtered_payloads(dataset, year, regions, income, gender, metric, age, country):
+    """Build the three store payloads; cached apart from publishing so handles stay valid."""
+    args = stage_arguments(year, regions, income, age, "Cardiovascular diseases", country, dataset)
+    base = region_income_stage(*args[:-1])
+    selected = country_stage(*args)
+    return (
+        world_map_payload(base, gender, metric),
+        geo_eco_payload(selected, gender, metric),
+        healthcare_payload(selected, dataset, gender, metric),
+    )
+
+
+def neighbouring_selections(dataset, year, regions, income, gender, metric, age, country):
+    """Selections one step away: the adjacent years and the other genders."""
+    first, last = dataset.year_range
+    selections = [
+        (dataset, other, regions, income, gender, metric, age, country)
+        for other in (year - 1, year + 1)
+        if first <= other <= last
+    ]
+    selections += [
+        (dataset, year, regions, income, other, metric, age, country)
+        for other in ("Both", "Female", "Male")
+        if other != gender
+    ]
+    return selections
 
-    df = filter_data(year, regions, income, gender, metric, age)
+
+PREFETCHER = Prefetcher(filtered_payloads, neighbouring_selections)
+
+
+def world_map_payload(base, gender, metric):
+    """Build the world map payload from the filtered slice."""
     col = get_metric_column(gender, metric)
-    df = df.with_columns(pl.col(col).cast(pl.Float64, strict=False))
+    if not col:
+        return []
 
-    if col:
-        df = df.select(["Entity", "Code", col, "region", "WB_Income", "cause"])
-        df = df.filter(pl.col("cause").str.to_lowercase() == "cardiovascular diseases")
+    df = run_query(
+        base,
+        columns=["Entity", "Code", col, "region", "WB_Income", "cause"],
+        casts={col: pl.Float64},
+        drop_nulls=[col],
+    )
+    return encode_frame(df)
 
-    return df.to_dicts()
 
+def geo_eco_payload(selected, gender, metric):
+    """Build the geo-economic payload from the filtered slice."""
+    if not gender or not metric:
+        return []
 
-@callback(
-    Output("trends-data", "data"),
-    Input("metric-dropdown", "value"),
-    Input("gender-dropdown", "value"),
-)
-def get_trends_data(metric, gender):
-    """Get filtered data for trends visualization."""
+    cols = [get_metric_column(g, metric) for g in ["Both", "Female", "Male"]]
+    cols = [col for col in cols if col]
+    if not cols:
+        return []
 
-    data_path = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "trends.csv"
+    numeric_cols = cols + ["gdp_pc", "Population"]
+    df = run_query(
+        selected,
+        columns=GEO_ECO_COLUMNS + cols,
+        casts={col: pl.Float32 for col in numeric_cols},
+        drop_nulls=numeric_cols,
     )
-    df = pl.read_csv(data_path)
+    return encode_frame(df)
 
-    metric = get_metric_column(gender, metric)
 
-    df = df.select(["cause", "age", "Year", metric])
-    # Pre-process data once during loading: convert Year to integer
-    df = df.with_columns(pl.col("Year").cast(pl.Int32))
+def healthcare_payload(selected, dataset, gender, metric):
+    """Build the healthcare payload from the filtered slice."""
+    if not metric:
+        return []
 
-    return df.to_dicts()
+    # Only keep rows where required columns and the selected metric are not null
+    col = get_metric_column(gender, metric) if gender else None
+    df = run_query(
+        selected,
+        columns=ID_COLUMNS + dataset.value_columns + ["obesity%"],
+        drop_nulls=ID_COLUMNS + ([col] if col else []),
+    )
+
+    logger.debug(f"Healthcare data shape: {df.shape}")
+    return encode_frame(df)
 
 
 @callback(
-    Output("healthcare-data", "data"),
-    Input("year-slider", "value"),
-    Input("region-dropdown", "value"),
-    Input("income-dropdown", "value"),
-    Input("gender-dropdown", "value"),
-    Input("metric-dropdown", "value"),
-    Input("age-dropdown", "value"),
-    Input("country-dropdown", "value"),
+    Output("map-playback-frames", "data"),
+    Input("map-playback-request", "data"),
+    State("region-dropdown", "value"),
+    State("income-dropdown", "value"),
+    State("gender-dropdown", "value"),
+    State("metric-dropdown", "value"),
+    State("age-dropdown", "value"),
+    prevent_initial_call=True,
 )
-def get_healthcare_data(year, regions, income, gender, metric, age, country):
-    """Get filtered data for healthcare system visualization."""
-    if not year or not metric:
-        return []
+def get_playback_frames(_, regions, income, gender, metric, age):
+    """Get the world map values of every year for in-browser playback.
 
-    df = filter_data(
-        year,
+    The frames carry the selection they were built for, so the browser skips frames that a
+    filter change has made stale.
+    """
+    frames = playback_frames(get_dataset(), regions, income, gender, metric, age)
+    return {**frames, "selection": [regions, income, gender, metric, age]} if frames else {}
+
+
+@cached(cache=SizedLRUCache(), key=cache_key)
+def playback_frames(dataset, regions, income, gender, metric, age):
+    """Build the year-indexed map frames of a selection with one query over all years.
+
+    Returns:
+        dict: ``years`` in order, a shared ``zmax`` and per-year ``locations`` and ``z``
+    """
+    col = get_metric_column(gender, metric)
+    if not col:
+        return {}
+
+    df = query_data(
+        None,
         regions,
         income,
-        gender=gender,
-        metric=metric,
         age=age,
         cause="Cardiovascular diseases",
+        columns=["Year", "Entity", col],
+        casts={"Entity": pl.Utf8, col: pl.Float64},
+        drop_nulls=[col],
+        dataset=dataset,
     )
-    if country:
-        df = df.filter(pl.col("Entity").is_in(country))
-
-    # Keep required columns
-    required_cols = ["Entity", "Code", "region", "WB_Income", "Year", "cause"]
-    optional_cols = ["obesity%"]
-
-    # Add all val* columns
-    val_cols = [col for col in df.columns if col.startswith("val")]
+    if df.is_empty():
+        return {}
+
+    frames = (
+        df.with_columns(pl.col(col).round_sig_figs(FLOAT_PRECISION))
+        .group_by("Year", maintain_order=True)
+        .agg(pl.col("Entity").alias("locations"), pl.col(col).alias("z"))
+        .sort("Year")
+    )
+    # One colour scale for the whole playback, rounded like the single-year map
+    zmax = round(df[col].max() / 100) * 100
+    return {
+        "years": frames["Year"].to_list(),
+        "zmax": zmax,
+        "frames": {
+            str(year): {"locations": locations, "z": z}
+            for year, locations, z in frames.iter_rows()
+        },
+    }
 
-    # Check which optional columns exist and combine with val columns
-    available_cols = required_cols + val_cols + [c for c in optional_cols if c in df.columns]
 
-    # Only keep rows where required columns are not null
+@callback(
+    Output("trends-data", "data"),
+    Input("metric-dropdown", "value"),
+    Input("gender-dropdown", "value"),
+)
+def get_trends_data(metric, gender):
+    """Get filtered data for trends visualization."""
+    trends_payloads = get_dataset().trends_payloads
+    return publish(trends_payloads.get(get_metric_column(gender, metric), []))
 
-    df = df.select(available_cols).drop_nulls(subset=required_cols)
 
-    logger.debug(f"Healthcare data shape: {df.shape}")
-    logger.debug(df.head())
-    return df.to_dicts()
+# Year shown by the Sankey diagram
+SANKEY_YEAR = 2019
 
 
 @callback(
@@ -252,62 +679,49 @@ def get_healthcare_data(year, regions, income, gender, metric, age, country):
 )
 def get_sankey_data(regions, income, gender, metric):
     """Get unfiltered data for Sankey diagram visualization."""
-    df = filter_data(
-        year=2019,
-        regions=regions,
-        income=income,
-        gender=gender,
-        metric=metric,
-        cause="Cardiovascular diseases",
-        age="Age-standardized",
-    )
     col = get_metric_column(gender, metric)
+    if not col:
+        return []
 
-    if col and col in df.columns:
-        required_cols = ["Entity", "Code", "region", "WB_Income", "Year", "cause"]
-        df = df.select(required_cols + [col]).drop_nulls(subset=required_cols + [col])
-        logger.debug(f"Sankey data shape: {df.shape}")
-        logger.debug(msg=df.head())
-        return df.to_dicts()
-
-    return []
+    df = sankey_rows(col, regions, income)
+    logger.debug(f"Sankey data shape: {df.shape}")
+    return publish(encode_frame(df))
 
 
-@callback(
-    Output("risk-data", "data"),
-    Input("gender-dropdown", "value"),
-    Input("metric-dropdown", "value"),
-)
-def get_risk_data(gender, metric):
-    """Get unfiltered data for Sankey diagram visualization."""
-    df = filter_data(
-        year=2019,
-        gender=gender,
-        metric=metric,
-        cause="Cardiovascular diseases",
+def sankey_rows(col, regions=None, income=None, year=SANKEY_YEAR, dataset=None):
+    """Rows of the Sankey diagram: the countries with ``col`` and every id column known."""
+    return query_data(
+        year=year,
+        regions=regions,
+        income=income,
         age="Age-standardized",
+        cause="Cardiovascular diseases",
+        columns=ID_COLUMNS + [col],
+        drop_nulls=ID_COLUMNS + [col],
+        dataset=dataset,
     )
-    col = get_metric_column(gender, metric)
 
-    if col and col in df.columns:
-        required_cols = [
-            "obesity%",
-            "t_htn_ctrl",
-            "t_high_bp_30-79",
-            "pacemaker_1m",
-            "t_htn_diag",  # ,'t_htn_rx_30-79'
-        ]
-        df = df.select(required_cols + [col]).drop_nulls(subset=required_cols + [col])
-        for col in required_cols:
-            df = df.with_columns(pl.col(col).cast(pl.Float64, strict=False))
-
-        numeric_cols = [
-            col
-            for col, dtype in df.schema.items()
-            if dtype in [pl.Int64, pl.Int32, pl.Float64, pl.Float32]
-        ]
-        df_numeric = df.select(numeric_cols)
-        # matrix = df_numeric.corr()
-        return df_numeric.to_dicts()
-
-    return []
+
+@cached(cache=SizedLRUCache(), key=cache_key)
+def metric_bins(ds, col, year):
+    """Inner edges of the Sankey metric ranges of ``col`` over every country in ``year``.
+
+    Returns ``(edges, quartiles)``: the quartiles, or bins around the mean when quartiles
+    repeat (``quartiles`` is then False). Values are rounded like the store payload, so
+    rows fall in the same range as in the decoded store.
+    """
+    values = sankey_rows(col, year=year, dataset=ds)[col]
+    values = (
+        values.cast(pl.Float64)
+        .round_sig_figs(FLOAT_PRECISION)
+        .cast(values.dtype)
+        .cast(pl.Float64)
+        .to_numpy()
+    )
+    if not len(values):
+        return (), True
+    edges = [float(edge) for edge in np.quantile(values, [0.25, 0.5, 0.75])]
+    if len({values.min(), *edges, values.max()}) == 5:
+        return tuple(edges), True
+    mean = float(values.mean())
+    return (mean / 2, mean, mean * 1.5), False
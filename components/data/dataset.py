@@ -0,0 +1,76 @@
+"""Lazily built, instrumented container for the loaded dataset and its lookups."""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Dataset:
+    """The loaded dataset plus every lookup derived from it, each built on first use.
+
+    Members are registered with :meth:`member` and read as attributes. A member is built
+    at most once, under a lock of its own, and the seconds it took are kept in
+    ``timings``; the time of a member includes the members it reads while it is being
+    built. Threads building different members never wait for each other, so a builder
+    may wait on another thread's query that itself needs some other member.
+
+    A dataset never changes once built. Reloading builds a new one with the next
+    ``version``; ``signature`` identifies the source files it was loaded from.
+    """
+
+    _builders = {}
+
+    def __init__(self, version=0, signature=None):
+        self.version = version
+        self.signature = signature
+        self.timings = {}
+        self._values = {}
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    @classmethod
+    def member(cls, name):
+        """Register ``func(dataset)`` as the builder of member ``name``."""
+
+        def register(func):
+            cls._builders[name] = func
+            return func
+
+        return register
+
+    def __getattr__(self, name):
+        builders = type(self)._builders
+        if name not in builders:
+            raise AttributeError(name)
+        try:
+            return self._values[name]
+        except KeyError:
+            pass
+        with self._locks_lock:
+            lock = self._locks.setdefault(name, threading.Lock())
+        with lock:
+            if name not in self._values:
+                start = time.perf_counter()
+                value = builders[name](self)
+                self.timings[name] = time.perf_counter() - start
+                self._values[name] = value
+            return self._values[name]
+
+    def is_built(self, name) -> bool:
+        """Return True when member ``name`` has already been built."""
+        return name in self._values
+
+    def build_all(self) -> dict:
+        """Build every registered member and return the build timings in seconds."""
+        start = time.perf_counter()
+        for name in type(self)._builders:
+            getattr(self, name)
+        logger.info(
+            "Dataset v%s built in %.3fs: %s",
+            self.version,
+            time.perf_counter() - start,
+            ", ".join(f"{name}={seconds:.3f}s" for name, seconds in self.timings.items()),
+        )
+        return dict(self.timings)
@@ -0,0 +1,79 @@
+"""Dictionary encoding of the dimension columns of the dataset.
+
+Dimension columns are stored as ``pl.Enum`` so equality and ``is_in`` filters compare
+integer codes instead of strings. Comparing an Enum column with a value outside its
+categories raises in Polars, so every filter built from callback inputs goes through
+:func:`match` / :func:`isin`, which resolve inputs against the dictionary first.
+"""
+
+import polars as pl
+
+DIMENSION_COLUMNS = ["Entity", "Code", "region", "WB_Income", "cause", "age"]
+
+
+def encode_dimensions(df: pl.DataFrame) -> pl.DataFrame:
+    """Cast the dimension columns to Enums over their sorted distinct values.
+
+    Sorted categories keep the physical order of the codes identical to the string order,
+    so sorting by an encoded column gives the same result as before. Columns that are
+    already encoded are left untouched.
+    """
+    casts = [
+        pl.col(col).cast(pl.Enum(sorted(df[col].drop_nulls().unique().to_list())))
+        for col in DIMENSION_COLUMNS
+        if col in df.columns and not isinstance(df.schema[col], pl.Enum)
+    ]
+    return df.with_columns(casts) if casts else df
+
+
+def build_dictionary(df: pl.DataFrame) -> dict[str, tuple[str, ...]]:
+    """Return the categories of every encoded dimension column."""
+    return {
+        col: tuple(dtype.categories.to_list())
+        for col, dtype in df.schema.items()
+        if isinstance(dtype, pl.Enum)
+    }
+
+
+class Dictionary:
+    """Resolve raw callback inputs against the encoded categories of the dataset."""
+
+    def __init__(self, df: pl.DataFrame):
+        self.categories = build_dictionary(df)
+        self._lookup = {
+            col: {value.lower(): value for value in values}
+            for col, values in self.categories.items()
+        }
+
+    def resolve(self, col, value):
+        """Return the category matching ``value``, ignoring case, or None when unknown."""
+        if col not in self._lookup:
+            return value
+        if value is None:
+            return None
+        return self._lookup[col].get(str(value).lower())
+
+    def resolve_all(self, col, values):
+        """Return the known categories among ``values``, dropping unknown inputs."""
+        if isinstance(values, str):
+            values = [values]
+        resolved = (self.resolve(col, value) for value in values)
+        return [value for value in resolved if value is not None]
+
+    def match(self, col, value) -> pl.Expr:
+        """Equality predicate that matches nothing when ``value`` is not a known category."""
+        resolved = self.resolve(col, value)
+        if resolved is None:
+            return pl.lit(False)
+        return pl.col(col) == resolved
+
+    def isin(self, col, values) -> pl.Expr:
+        """Membership predicate over the known categories among ``values``."""
+        resolved = self.resolve_all(col, values)
+        if not resolved:
+            return pl.lit(False)
+        return pl.col(col).is_in(resolved)
+
+    def matching(self, col, predicate) -> list[str]:
+        """Return the categories of ``col`` for which ``predicate`` is true."""
+        return [value for value in self.categories.get(col, ()) if predicate(value)]
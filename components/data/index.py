@@ -0,0 +1,158 @@
+"""Row-range indexes over the loaded dataset."""
+
+import logging
+import threading
+
+import polars as pl
+
+logger = logging.getLogger(__name__)
+
+# Sort order of the loaded frame; every prefix of these keys maps to one contiguous run of rows
+PARTITION_KEYS = ["Year", "age", "cause"]
+
+
+class PartitionIndex:
+    """Map (Year, age, cause) keys, and their prefixes, to contiguous row ranges.
+
+    The frame must be sorted by ``PARTITION_KEYS`` so each partition can be taken with a
+    zero-copy ``DataFrame.slice`` instead of a full-table filter.
+    """
+
+    def __init__(self, df: pl.DataFrame):
+        groups = (
+            df.select(PARTITION_KEYS)
+            .with_row_index("row")
+            .group_by(PARTITION_KEYS)
+            .agg(
+                pl.col("row").min().alias("start"),
+                pl.col("row").max().alias("end"),
+                pl.len().alias("length"),
+            )
+        )
+        if groups.filter(pl.col("end") - pl.col("start") + 1 != pl.col("length")).height:
+            raise ValueError(f"Frame is not sorted by {PARTITION_KEYS}")
+
+        self.ranges = {}
+        for year, age, cause, start, _, length in groups.iter_rows():
+            for key in ((year,), (year, age), (year, age, cause)):
+                offset, size = self.ranges.get(key, (start, 0))
+                self.ranges[key] = (min(offset, start), size + length)
+
+    def lookup(self, year, age=None, cause=None):
+        """Return ``(offset, length)`` for the longest key prefix given, ``(0, 0)`` if absent.
+
+        ``cause`` is only part of the key when ``age`` is given as well.
+        """
+        key = (int(year),)
+        if age:
+            key += (age,)
+            if cause:
+                key += (cause,)
+        return self.ranges.get(key, (0, 0))
+
+    def slice(self, df: pl.DataFrame, year, age=None, cause=None) -> pl.DataFrame:
+        """Return the partition rows of ``df`` without scanning or copying."""
+        offset, length = self.lookup(year, age, cause)
+        return df.slice(offset, length)
+
+
+def sort_partitions(df: pl.DataFrame) -> pl.DataFrame:
+    """Sort the frame so each partition is contiguous, keeping row order within partitions."""
+    return df.sort(PARTITION_KEYS, maintain_order=True)
+
+
+def build_partition_index(df: pl.DataFrame) -> tuple[pl.DataFrame, PartitionIndex]:
+    """Index the frame, sorting it first when it was loaded from an unsorted snapshot."""
+    try:
+        return df, PartitionIndex(df)
+    except ValueError:
+        logger.warning("Data is not sorted by %s, sorting before indexing", PARTITION_KEYS)
+        df = sort_partitions(df).rechunk()
+        return df, PartitionIndex(df)
+
+
+# Sort order of the entity index; each (Entity, age, cause) series is one run of rows by year
+ENTITY_KEYS = ["Entity", "age", "cause"]
+
+
+class EntityIndex:
+    """Per-country time series and yearly cause rankings for the map tooltips.
+
+    The rows are ordered once by ``ENTITY_KEYS`` and year, so the series of a country,
+    age and cause is a contiguous slice. Metric columns are cast and their causes ranked
+    on the first lookup of each column; every later lookup is a dict access.
+
+    Args:
+        df: The loaded frame
+        excluded_causes: Causes left out of the rankings
+    """
+
+    def __init__(self, df: pl.DataFrame, excluded_causes):
+        order = (
+            df.select(ENTITY_KEYS + ["Year"])
+            .with_row_index("row")
+            .sort(ENTITY_KEYS + ["Year"], maintain_order=True)
+        )
+        groups = (
+            order.with_row_index("position")
+            .group_by(ENTITY_KEYS)
+            .agg(pl.col("position").min().alias("start"), pl.len().alias("length"))
+        )
+        self.ranges = {(e, a, c): (start, n) for e, a, c, start, n in groups.iter_rows()}
+        self.entities = {key[0] for key in self.ranges}
+        self.years = order["Year"].to_numpy()
+        self._df = df
+        self._rows = order["row"]
+        self._excluded = list(excluded_causes)
+        self._columns = {}
+        self._rankings = {}
+        self._lock = threading.Lock()
+
+    def _column(self, col):
+        """Return the values of ``col`` in index order and the mask of non-null values."""
+        with self._lock:
+            if col not in self._columns:
+                values = self._df[col].cast(pl.Float64, strict=False).gather(self._rows)
+                self._columns[col] = (values.to_numpy(), values.is_not_null().to_numpy())
+            return self._columns[col]
+
+    def _ranking(self, col):
+        with self._lock:
+            if col not in self._rankings:
+                ranked = (
+                    self._df.select(
+                        "Entity",
+                        "age",
+                        "Year",
+                        "cause",
+                        pl.col(col).cast(pl.Float64, strict=False),
+                    )
+                    .filter(~pl.col("cause").is_in(self._excluded))
+                    .drop_nulls(subset=[col])
+                    .sort(col, descending=True, maintain_order=True)
+                    .group_by(["Entity", "age", "Year"], maintain_order=True)
+                    .agg("cause", col)
+                )
+                self._rankings[col] = {
+                    (entity, age, year): tuple(zip(causes, values))
+                    for entity, age, year, causes, values in ranked.iter_rows()
+                }
+            return self._rankings[col]
+
+    def series(self, entity, age, cause, col):
+        """Return the years and non-null values of ``col`` for one country, age and cause.
+
+        Unknown (None) keys match nothing, like :meth:`Dictionary.match`.
+        """
+        if None in (entity, age, cause):
+            return self.years[:0], self._column(col)[0][:0]
+        start, length = self.ranges.get((entity, age, cause), (0, 0))
+        values, valid = self._column(col)
+        valid = valid[start : start + length]
+        return self.years[start : start + length][valid], values[start : start + length][valid]
+
+    def ranking(self, entity, age, year, col):
+        """Return ``(cause, value)`` pairs of one country, age and year, highest first."""
+        if None in (entity, age):
+            return ()
+        return self._ranking(col).get((entity, age, year), ())
@@ -0,0 +1,86 @@
+"""Compact columnar payloads for the ``dcc.Store`` outputs of the data callbacks.
+
+``DataFrame.to_dicts()`` repeats every column name on every row and writes Float32
+values with their full binary noise (``388.4800109863281``). :func:`encode_frame` sends
+one list per column instead, dictionary-encodes string columns and rounds floats to a
+configurable number of significant digits. Every tab rebuilds frames with
+:func:`decode_frame`, which also accepts the legacy list-of-rows format.
+"""
+
+import os
+
+import polars as pl
+
+from components.data.store import resolve
+
+# Significant digits kept for float columns; Float32 data carries about 7
+FLOAT_PRECISION = int(os.getenv("PAYLOAD_FLOAT_PRECISION", "7"))
+
+PAYLOAD_FORMAT = "columnar"
+
+STRING_TYPES = (pl.Utf8, pl.Categorical, pl.Enum)
+
+
+def _dtype_name(dtype) -> str:
+    """Return the schema name of a dtype, e.g. ``Float32`` or ``Enum``."""
+    return dtype.base_type().__name__
+
+
+def encode_frame(df: pl.DataFrame, precision: int = FLOAT_PRECISION) -> dict:
+    """Encode a frame as a JSON-ready columnar payload.
+
+    Args:
+        df (pl.DataFrame): Frame to encode
+        precision (int, optional): Significant digits kept for float columns.
+            ``None`` keeps full precision.
+
+    Returns:
+        dict: Payload with ``schema``, ``columns``, ``dictionaries`` and ``length``
+    """
+    schema, columns, dictionaries = {}, {}, {}
+    for series in df.get_columns():
+        name, dtype = series.name, series.dtype
+        schema[name] = _dtype_name(dtype)
+        if isinstance(dtype, STRING_TYPES):
+            values = series.cast(pl.Utf8)
+            categories = values.drop_nulls().unique(maintain_order=True).to_list()
+            dictionaries[name] = categories
+            columns[name] = values.cast(pl.Enum(categories)).to_physical().to_list()
+        elif dtype.is_float() and precision is not None:
+            columns[name] = series.cast(pl.Float64).round_sig_figs(precision).to_list()
+        else:
+            columns[name] = series.to_list()
+
+    return {
+        "format": PAYLOAD_FORMAT,
+        "length": df.height,
+        "schema": schema,
+        "columns": columns,
+        "dictionaries": dictionaries,
+    }
+
+
+def decode_frame(payload) -> pl.DataFrame:
+    """Rebuild a Polars frame from a store payload.
+
+    Dictionary-encoded columns come back as plain strings. Server-side store handles are
+    resolved first; an evicted handle raises ``PreventUpdate`` (see
+    :func:`components.data.store.resolve`). Empty payloads give an empty frame and lists of
+    row dicts (the legacy store format) are still accepted.
+    """
+    payload = resolve(payload)
+    if not payload:
+        return pl.DataFrame()
+    if isinstance(payload, list):
+        return pl.DataFrame(payload)
+
+    series = []
+    for name, type_name in payload["schema"].items():
+        values = payload["columns"][name]
+        if name in payload["dictionaries"]:
+            categories = pl.Series(name, payload["dictionaries"][name], dtype=pl.Utf8)
+            series.append(categories.gather(pl.Series(values, dtype=pl.UInt32)))
+        else:
+            dtype = getattr(pl, type_name, None)
+            series.append(pl.Series(name, values, dtype=dtype, strict=False))
+    return pl.DataFrame(series)
@@ -0,0 +1,146 @@
+"""Speculative prefetch of the selections a user is likely to ask for next.
+
+After a request is served, :class:`Prefetcher` computes the neighbouring selections
+(the adjacent years and the other genders) in a small thread pool, so the next slider
+step or gender toggle finds its result in the cache. Prefetching stays within a budget:
+at most ``PREFETCH_WORKERS`` threads and ``PREFETCH_MAX_PENDING`` queued selections, and
+nothing is scheduled while the load average per CPU is above ``PREFETCH_MAX_LOAD`` or the
+cache is more than ``PREFETCH_MAX_FILL`` full, so prefetched entries do not evict
+requested ones.
+
+:meth:`Prefetcher.stats` reports how requests were served (prefetched, cached or
+computed) and their latency percentiles, to check that prefetching pays off.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+PREFETCH = os.getenv("PREFETCH", "0") == "1"
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "1"))
+PREFETCH_MAX_PENDING = int(os.getenv("PREFETCH_MAX_PENDING", "8"))
+PREFETCH_MAX_LOAD = float(os.getenv("PREFETCH_MAX_LOAD", "0.75"))
+PREFETCH_MAX_FILL = float(os.getenv("PREFETCH_MAX_FILL", "0.8"))
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Prefetcher:
+    """Prefetch the neighbours of every served call of a cached function.
+
+    Args:
+        func: Function wrapped by :func:`components.data.cache.cached`
+        neighbours: Function of the call arguments returning the argument tuples
+            worth computing ahead
+    """
+
+    def __init__(
+        self,
+        func,
+        neighbours,
+        enabled=PREFETCH,
+        workers=PREFETCH_WORKERS,
+        max_pending=PREFETCH_MAX_PENDING,
+    ):
+        self.func = func
+        self.neighbours = neighbours
+        self.enabled = enabled
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._prefetched = OrderedDict()
+        self._latencies = deque(maxlen=1000)
+        self._counts = {
+            "prefetch_hits": 0,
+            "cache_hits": 0,
+            "misses": 0,
+            "scheduled": 0,
+            "skipped": 0,
+            "failed": 0,
+        }
+
+    def _cached(self, args) -> bool:
+        return self.func.cache_key(*args) in self.func.cache
+
+    def serve(self, *args):
+        """Call the function, record how it was served and prefetch its neighbours."""
+        start = time.perf_counter()
+        key = self.func.cache_key(*args)
+        cached = key in self.func.cache
+        result = self.func(*args)
+        with self._lock:
+            if not cached:
+                self._counts["misses"] += 1
+            elif self._prefetched.pop(key, None):
+                self._counts["prefetch_hits"] += 1
+            else:
+                self._counts["cache_hits"] += 1
+            self._latencies.append(time.perf_counter() - start)
+        if self.enabled:
+            for neighbour in self.neighbours(*args):
+                self._schedule(neighbour)
+        return result
+
+    def _over_budget(self) -> bool:
+        cache = self.func.cache
+        if cache.currsize > PREFETCH_MAX_FILL * cache.maxsize:
+            return True
+        try:
+            load = os.getloadavg()[0] / (os.cpu_count() or 1)
+        except OSError:
+            return False
+        return load > PREFETCH_MAX_LOAD
+
+    def _schedule(self, args):
+        if self._cached(args):
+            return
+        with self._lock:
+            if self._pending >= self.max_pending or self._over_budget():
+                self._counts["skipped"] += 1
+                return
+            self._pending += 1
+            self._counts["scheduled"] += 1
+        self._executor.submit(self._prefetch, args)
+
+    def _prefetch(self, args):
+        try:
+            if not self._cached(args):
+                self.func(*args)
+                with self._lock:
+                    self._prefetched[self.func.cache_key(*args)] = True
+                    while len(self._prefetched) > self.max_pending * 16:
+                        self._prefetched.popitem(last=False)
+        except Exception:
+            logger.exception("Prefetch of %s failed", self.func.__qualname__)
+            with self._lock:
+                self._counts["failed"] += 1
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self) -> dict:
+        """Return how served calls were answered, the prefetch counts and latencies."""
+        with self._lock:
+            counts = dict(self._counts)
+            latencies = list(self._latencies)
+            pending = self._pending
+        served = counts["prefetch_hits"] + counts["cache_hits"] + counts["misses"]
+        return {
+            **counts,
+            "pending": pending,
+            "served": served,
+            "prefetch_hit_rate": counts["prefetch_hits"] / served if served else None,
+            "p50_seconds": _percentile(latencies, 0.5),
+            "p95_seconds": _percentile(latencies, 0.95),
+        }
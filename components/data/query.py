@@ -0,0 +1,35 @@
+"""Single-collect lazy queries over the loaded dataset."""
+
+import polars as pl
+
+
+def run_query(frame, predicates=(), columns=None, casts=None, drop_nulls=None) -> pl.DataFrame:
+    """Run filters, null-drops, casts and a projection over ``frame`` as one lazy query.
+
+    Building the whole query on a ``LazyFrame`` lets Polars prune unused columns and
+    order the predicates before any row is copied, instead of materializing the full-width
+    frame after every step.
+
+    Args:
+        frame (pl.DataFrame): Frame to query, usually a partition slice
+        predicates (iterable of pl.Expr): Row filters, combined with AND
+        columns (list, optional): Columns to keep, in order. Defaults to all columns.
+        casts (dict, optional): Column name to dtype; casts are non-strict
+        drop_nulls (list, optional): Columns whose null rows are dropped before casting
+
+    Returns:
+        pl.DataFrame: The collected result
+    """
+    query = frame.lazy()
+    predicates = list(predicates)
+    if predicates:
+        query = query.filter(pl.all_horizontal(predicates))
+    if drop_nulls:
+        query = query.drop_nulls(subset=drop_nulls)
+    if casts:
+        query = query.with_columns(
+            [pl.col(col).cast(dtype, strict=False) for col, dtype in casts.items()]
+        )
+    if columns:
+        query = query.select(columns)
+    return query.collect()
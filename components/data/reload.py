@@ -0,0 +1,57 @@
+"""Background reload of the dataset when its snapshot or CSV files change.
+
+With ``DATA_RELOAD_INTERVAL`` set to a number of seconds, :func:`start_reloader` polls
+the source files of the dataset and calls
+:func:`components.data.data.reload_dataset` when they change, so new data is served
+without restarting the workers. Rebuild the snapshots with
+``python -m components.data.snapshot``; they are renamed into place, so the reloader
+never reads a partially written file. Snapshots loaded from copies
+(``HEART_SNAPSHOT_SHM``) are watched at their original paths and copied again when they
+change.
+"""
+
+import logging
+import os
+import threading
+
+from components.data.data import reload_dataset
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks of the source files; 0 disables the reloader
+DATA_RELOAD_INTERVAL = float(os.getenv("DATA_RELOAD_INTERVAL", "0"))
+
+_stop = threading.Event()
+
+
+def _watch(interval):
+    while not _stop.wait(interval):
+        try:
+            reload_dataset()
+        except Exception:
+            # Keep serving the current dataset; the next change is tried again
+            logger.exception("Dataset reload failed")
+
+
+def start_reloader(interval=DATA_RELOAD_INTERVAL):
+    """Start the reload thread of this process.
+
+    Threads do not survive a fork, so with gunicorn this runs in every worker.
+
+    Returns:
+        threading.Thread: The reload thread, or None when reloading is disabled
+    """
+    if interval <= 0:
+        return None
+    _stop.clear()
+    thread = threading.Thread(
+        target=_watch, args=(interval,), name="dataset-reloader", daemon=True
+    )
+    thread.start()
+    logger.info("Checking the dataset sources for changes every %ss", interval)
+    return thread
+
+
+def stop_reloader():
+    """Stop the reload thread after its current check."""
+    _stop.set()
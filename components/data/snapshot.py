@@ -0,0 +1,200 @@
+#! usr/bin/env python3
+"""Build and load the typed Arrow IPC snapshot of the processed dataset.
+
+Parsing ``heart_processed.csv`` and re-casting every column in each gunicorn worker is
+slow, so the snapshot is written once at deploy time::
+
+    python -m components.data.snapshot
+
+and workers memory-map it with :func:`load_snapshot`. The file is written uncompressed
+so the column buffers are read straight from the OS page cache and shared between
+processes instead of being parsed into private memory.
+"""
+
+import logging
+import os
+import shutil
+import time
+
+import polars as pl
+
+from components.data.encoding import encode_dimensions
+from components.data.index import sort_partitions
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data"
+)
+CSV_PATH = os.path.join(DATA_DIR, "heart_processed.csv")
+SNAPSHOT_PATH = os.getenv("HEART_SNAPSHOT_PATH", os.path.join(DATA_DIR, "heart_processed.arrow"))
+TRENDS_CSV_PATH = os.path.join(DATA_DIR, "trends.csv")
+TRENDS_SNAPSHOT_PATH = os.getenv("TRENDS_SNAPSHOT_PATH", os.path.join(DATA_DIR, "trends.arrow"))
+
+# Snapshots loaded from a copy (see copy_snapshots): original path by copy path
+SNAPSHOT_COPIES = {}
+
+
+def prepare_frame(df: pl.DataFrame) -> pl.DataFrame:
+    """Apply the load-time casts that every consumer of the dataset relies on."""
+    # Convert Year to integer
+    df = df.with_columns(pl.col("Year").cast(pl.Int32))
+
+    # Convert numeric columns to efficient types, skipping WB_Income
+    float_cols = [
+        col for col, typ in df.schema.items() if typ == pl.Float64 and col != "WB_Income"
+    ]
+    df = df.with_columns([pl.col(col).cast(pl.Float32) for col in float_cols])
+
+    # Handle WB_Income column
+    df = df.with_columns(pl.col("WB_Income").fill_null("Unknown").cast(pl.Utf8))
+
+    # Dictionary-encode the dimension columns
+    df = encode_dimensions(df)
+
+    # Keep each (Year, age, cause) partition contiguous for the partition index
+    return sort_partitions(df).rechunk()
+
+
+def prepare_trends(df: pl.DataFrame) -> pl.DataFrame:
+    """Drop the CSV index column of the trends table and cast Year like the main dataset."""
+    df = df.drop([col for col in ("", "Unnamed: 0") if col in df.columns])
+    df = df.with_columns(pl.col("Year").cast(pl.Int32))
+    return df.sort(["cause", "age", "Year"], maintain_order=True).rechunk()
+
+
+def read_csv(csv_path: str | None = None) -> pl.DataFrame:
+    """Parse the processed CSV and apply the load-time casts."""
+    return prepare_frame(pl.read_csv(csv_path or CSV_PATH))
+
+
+def read_trends_csv(csv_path: str | None = None) -> pl.DataFrame:
+    """Parse the trends CSV and apply its load-time casts."""
+    return prepare_trends(pl.read_csv(csv_path or TRENDS_CSV_PATH))
+
+
+def snapshot_is_fresh(csv_path: str | None = None, snapshot_path: str | None = None) -> bool:
+    """Return True when the snapshot exists and is not older than the CSV it was built from."""
+    csv_path = csv_path or CSV_PATH
+    snapshot_path = snapshot_path or SNAPSHOT_PATH
+    if not os.path.exists(snapshot_path):
+        return False
+    if not os.path.exists(csv_path):
+        return True
+    return os.path.getmtime(snapshot_path) >= os.path.getmtime(csv_path)
+
+
+def _file_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def source_signature() -> tuple:
+    """Return the modification times and sizes of every file the dataset is loaded from.
+
+    Missing files count as ``None``, so a snapshot appearing or being replaced changes the
+    signature. Snapshots loaded from a copy are watched at their original path.
+    """
+    paths = (CSV_PATH, SNAPSHOT_PATH, TRENDS_CSV_PATH, TRENDS_SNAPSHOT_PATH)
+    return tuple(_file_signature(SNAPSHOT_COPIES.get(path, path)) for path in paths)
+
+
+def copy_snapshots(target_dir: str) -> None:
+    """Load the snapshots from copies in ``target_dir``, e.g. in ``/dev/shm``.
+
+    The original paths are still the ones watched for changes; :func:`refresh_copies`
+    copies a rebuilt snapshot over its copy before the dataset is reloaded.
+    """
+    global SNAPSHOT_PATH, TRENDS_SNAPSHOT_PATH
+    os.makedirs(target_dir, exist_ok=True)
+    copies = []
+    for original in (SNAPSHOT_PATH, TRENDS_SNAPSHOT_PATH):
+        copy = os.path.join(target_dir, os.path.basename(original))
+        SNAPSHOT_COPIES[copy] = original
+        copies.append(copy)
+    SNAPSHOT_PATH, TRENDS_SNAPSHOT_PATH = copies
+    refresh_copies()
+
+
+def refresh_copies() -> None:
+    """Copy every snapshot whose original has changed over its copy.
+
+    The copy keeps the original's modification time, so it is as fresh as the original
+    relative to the CSV, and is renamed into place like :func:`build_snapshot` does.
+    """
+    for copy, original in SNAPSHOT_COPIES.items():
+        signature = _file_signature(original)
+        if signature is None or signature == _file_signature(copy):
+            continue
+        tmp_path = f"{copy}.{os.getpid()}.tmp"
+        shutil.copy2(original, tmp_path)
+        os.replace(tmp_path, copy)
+        logger.info("Copied snapshot %s to %s", original, copy)
+
+
+def build_snapshot(
+    csv_path: str | None = None, snapshot_path: str | None = None, read=read_csv
+) -> str:
+    """Write the typed snapshot next to the CSV.
+
+    The file is written to a temporary path and renamed into place so workers that are
+    starting concurrently never map a partially written file.
+
+    Returns:
+        str: Path of the written snapshot
+    """
+    csv_path = csv_path or CSV_PATH
+    snapshot_path = snapshot_path or SNAPSHOT_PATH
+    start = time.perf_counter()
+    df = read(csv_path)
+    tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    df.write_ipc(tmp_path, compression="uncompressed")
+    os.replace(tmp_path, snapshot_path)
+    logger.info(
+        "Wrote snapshot %s %s in %.2fs", snapshot_path, df.shape, time.perf_counter() - start
+    )
+    return snapshot_path
+
+
+def load_snapshot(snapshot_path: str | None = None) -> pl.DataFrame:
+    """Memory-map the snapshot; no parsing or casting happens here."""
+    return pl.read_ipc(snapshot_path or SNAPSHOT_PATH, memory_map=True, rechunk=False)
+
+
+def load_table(
+    csv_path: str | None = None, snapshot_path: str | None = None, read=read_csv
+) -> tuple[pl.DataFrame, str]:
+    """Memory-map a table's snapshot, or parse its CSV when the snapshot is missing or stale.
+
+    The paths default to the module's ``CSV_PATH`` and ``SNAPSHOT_PATH`` at call time, so
+    repointing them (as the gunicorn config does for ``/dev/shm``) takes effect.
+
+    Returns:
+        tuple: The frame and the path it was read from
+    """
+    csv_path = csv_path or CSV_PATH
+    snapshot_path = snapshot_path or SNAPSHOT_PATH
+    if snapshot_is_fresh(csv_path, snapshot_path):
+        return load_snapshot(snapshot_path), snapshot_path
+    logger.warning(
+        "Snapshot %s missing or stale, parsing CSV. "
+        "Run `python -m components.data.snapshot` to build it.",
+        snapshot_path,
+    )
+    return read(csv_path), csv_path
+
+
+def build_all() -> list[str]:
+    """Build the snapshots of every table the dashboard reads."""
+    return [
+        build_snapshot(CSV_PATH, SNAPSHOT_PATH, read_csv),
+        build_snapshot(TRENDS_CSV_PATH, TRENDS_SNAPSHOT_PATH, read_trends_csv),
+    ]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    build_all()
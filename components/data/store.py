@@ -0,0 +1,102 @@
+"""Server-side result store for data callback payloads.
+
+By default data callbacks send their payload to the browser, which uploads it again as
+an input of every figure callback. With ``RESULT_STORE=server`` the payload is kept on
+the server under its content hash and only ``{"handle": <hash>}`` travels through
+``dcc.Store``; :func:`components.data.payload.decode_frame` resolves handles.
+
+Payloads live in an in-process LRU. When several gunicorn workers serve the app, set
+``RESULT_STORE_DIR`` to a directory shared by all workers so a handle written by one
+worker can be read by another; ``gunicorn.conf.py`` refuses to start more than one worker
+without it. A handle that has been evicted anyway leaves the figures as they are instead
+of drawing them from no data.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from cachetools import LRUCache
+from dash.exceptions import PreventUpdate
+from flask_caching.backends import FileSystemCache
+
+logger = logging.getLogger(__name__)
+
+RESULT_STORE = os.getenv("RESULT_STORE", "client")
+RESULT_STORE_DIR = os.getenv("RESULT_STORE_DIR")
+RESULT_STORE_SIZE = int(os.getenv("RESULT_STORE_SIZE", "256"))
+
+
+def content_hash(payload) -> str:
+    """Return a stable hash of a JSON-serializable payload."""
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha1(encoded).hexdigest()
+
+
+class ResultStore:
+    """Content-addressed payload store: in-process LRU with an optional shared backend."""
+
+    def __init__(self, maxsize=RESULT_STORE_SIZE, cache_dir=None):
+        self._memory = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._shared = (
+            FileSystemCache(cache_dir, threshold=maxsize * 4, default_timeout=0)
+            if cache_dir
+            else None
+        )
+
+    def put(self, payload) -> str:
+        """Store a payload and return its handle."""
+        handle = content_hash(payload)
+        with self._lock:
+            self._memory[handle] = payload
+        if self._shared is not None and not self._shared.has(handle):
+            self._shared.set(handle, payload)
+        return handle
+
+    def get(self, handle):
+        """Return the payload for a handle, or None when it has been evicted."""
+        with self._lock:
+            payload = self._memory.get(handle)
+        if payload is None and self._shared is not None:
+            payload = self._shared.get(handle)
+            if payload is not None:
+                with self._lock:
+                    self._memory[handle] = payload
+        return payload
+
+
+STORE = ResultStore(cache_dir=RESULT_STORE_DIR)
+
+
+def is_handle(value) -> bool:
+    """Return True when a store value is a handle rather than a payload."""
+    return isinstance(value, dict) and set(value) == {"handle"}
+
+
+def publish(payload):
+    """Return what a data callback should write to its ``dcc.Store``.
+
+    Empty payloads and the default client mode return the payload itself.
+    """
+    if RESULT_STORE != "server" or not payload:
+        return payload
+    return {"handle": STORE.put(payload)}
+
+
+def resolve(value):
+    """Return the payload behind a store value, fetching it when it is a handle.
+
+    Raises:
+        PreventUpdate: The handle is no longer in the store, so the callback reading it
+            keeps its current outputs rather than showing an empty selection
+    """
+    if not is_handle(value):
+        return value
+    payload = STORE.get(value["handle"])
+    if payload is None:
+        logger.warning("Result %s is no longer in the store", value["handle"])
+        raise PreventUpdate
+    return payload
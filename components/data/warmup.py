@@ -0,0 +1,140 @@
+"""Cache warm-up so the first visitors after a deploy do not pay for cold caches.
+
+``WARMUP_MODE`` chooses when it runs: ``blocking`` before a worker takes requests,
+``background`` in a thread once the worker is up, or ``off``.
+The warm-up builds the dataset, the store payloads of the default sidebar selection for
+every year and a first map figure, then replays the most popular selections recorded in
+``WARMUP_SELECTIONS_PATH``.
+
+``WARMUP_RECORD=1`` appends every selection of the data callbacks to that file as JSON
+lines, so the list can be recorded from real traffic. ``/ready`` reports the progress and
+answers 503 until the warm-up has finished.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+
+from flask import jsonify
+
+logger = logging.getLogger(__name__)
+
+WARMUP_MODE = os.getenv("WARMUP_MODE", "off")
+WARMUP_SELECTIONS_PATH = os.getenv("WARMUP_SELECTIONS_PATH")
+WARMUP_RECORD = os.getenv("WARMUP_RECORD", "0") == "1"
+WARMUP_TOP_N = int(os.getenv("WARMUP_TOP_N", "20"))
+
+SELECTION_FIELDS = ["year", "regions", "income", "gender", "metric", "age", "country"]
+
+# Initial values of the sidebar and the year slider
+DEFAULT_SELECTION = {
+    "year": 2021,
+    "regions": None,
+    "income": None,
+    "gender": "Both",
+    "metric": "Death Rate",
+    "age": "Age-standardized",
+    "country": None,
+}
+
+_progress = {"status": "pending", "done": 0, "total": 0, "seconds": None}
+_progress_lock = threading.Lock()
+_record_lock = threading.Lock()
+
+
+def record_selection(*values):
+    """Append one data callback selection to the recorded traffic, when recording."""
+    if not (WARMUP_RECORD and WARMUP_SELECTIONS_PATH):
+        return
+    line = json.dumps(dict(zip(SELECTION_FIELDS, values)), sort_keys=True)
+    with _record_lock, open(WARMUP_SELECTIONS_PATH, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+
+def popular_selections(path=WARMUP_SELECTIONS_PATH, top_n=WARMUP_TOP_N):
+    """Return the ``top_n`` most frequent recorded selections, most frequent first."""
+    if not path or not os.path.exists(path):
+        return []
+    counts = Counter()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                selection = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            counts[json.dumps(selection, sort_keys=True)] += 1
+    return [json.loads(selection) for selection, _ in counts.most_common(top_n)]
+
+
+def warmup_selections():
+    """Return the default selection for every year followed by the popular selections."""
+    from components.data.data import get_dataset
+
+    first, last = get_dataset().year_range
+    selections = [dict(DEFAULT_SELECTION, year=year) for year in range(last, first - 1, -1)]
+    selections += [s for s in popular_selections() if s.get("year") and s not in selections]
+    return selections
+
+
+def _update(**values):
+    with _progress_lock:
+        _progress.update(values)
+
+
+def progress() -> dict:
+    """Return the warm-up status, steps done and total steps."""
+    with _progress_lock:
+        return dict(_progress, mode=WARMUP_MODE)
+
+
+def is_ready() -> bool:
+    with _progress_lock:
+        return WARMUP_MODE == "off" or _progress["status"] in ("done", "failed")
+
+
+def run_warmup():
+    """Warm the dataset, the store payload caches and the map figure code."""
+    from components.data.data import filtered_payloads, get_dataset, initialize
+    from components.visualisations import create_chloropleth_map
+
+    start = time.perf_counter()
+    _update(status="running", done=0, total=0)
+    try:
+        initialize()
+        ds = get_dataset()
+        selections = warmup_selections()
+        _update(total=len(selections))
+        for done, selection in enumerate(selections, start=1):
+            values = [selection.get(field) for field in SELECTION_FIELDS]
+            payloads = filtered_payloads(ds, *values)
+            if done == 1:
+                # The first figure loads plotly's validators; later figures reuse them
+                create_chloropleth_map(payloads[0], selection["metric"], selection["gender"])
+            _update(done=done)
+    except Exception:
+        logger.exception("Warm-up failed")
+        _update(status="failed", seconds=time.perf_counter() - start)
+        return
+    _update(status="done", seconds=time.perf_counter() - start)
+    logger.info("Warmed %s selections in %.2fs", progress()["done"], progress()["seconds"])
+
+
+def start_warmup(mode=None):
+    """Run the warm-up now (``blocking``), in a thread (``background``), or not at all."""
+    mode = mode or WARMUP_MODE
+    if mode == "blocking":
+        run_warmup()
+    elif mode == "background":
+        threading.Thread(target=run_warmup, name="cache-warmup", daemon=True).start()
+
+
+def _ready_view():
+    return jsonify(progress()), 200 if is_ready() else 503
+
+
+def register_readiness(server):
+    """Serve the warm-up progress at ``/ready`` on the Flask ``server``."""
+    server.add_url_rule("/ready", "ready", _ready_view)
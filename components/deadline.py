@@ -0,0 +1,118 @@
+"""Time budgets for slow figure callbacks.
+
+:func:`deadline` runs a callback in a worker thread and waits at most its budget for the
+result. Past the budget the callback returns its fallback, by default ``no_update`` so
+the figures already on screen stay there, and the late result is kept so the next call
+with the same inputs returns it at once. ``CALLBACK_DEADLINE`` sets the default budget in
+seconds; ``0`` disables it.
+
+With ``retry`` the fallback is a placeholder saying the figures are still being computed,
+and an interval inside it re-runs the callback through :func:`retry_input` until the late
+result has reached the screen.
+"""
+
+import contextvars
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from cachetools import LRUCache
+from dash import ALL, Input, dcc, html, no_update
+
+from components.data.store import content_hash
+
+logger = logging.getLogger(__name__)
+
+CALLBACK_DEADLINE = float(os.getenv("CALLBACK_DEADLINE", "0"))
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="callback-deadline")
+
+
+def _retry_id(target, index=ALL):
+    return {"type": "deadline-retry", "target": target, "index": index}
+
+
+def retry_input(target):
+    """Input that re-runs a ``deadline(retry=target)`` callback while its placeholder shows.
+
+    It must be the last input of the callback; ``target`` names the placeholder, usually
+    after the output it is shown in.
+    """
+    return Input(_retry_id(target), "n_intervals")
+
+
+def placeholder(target, budget):
+    """Message shown instead of the figures while they are computed past the budget."""
+    return html.Div(
+        [
+            html.Div("Still computing the charts for this selection..."),
+            dcc.Interval(id=_retry_id(target, 0), interval=max(budget, 1) * 1000),
+        ],
+        style={"margin": "20px"},
+    )
+
+
+def deadline(seconds=None, fallback=None, late_results=16, retry=None):
+    """Bound how long a callback may take before it answers.
+
+    Args:
+        seconds (float, optional): Time budget; defaults to ``CALLBACK_DEADLINE``
+        fallback (callable, optional): Called with the callback arguments when the budget
+            is exceeded. Defaults to the ``retry`` placeholder, or ``no_update`` without it.
+        late_results (int, optional): Number of results finished after their budget that
+            are kept for the next call with the same inputs
+        retry (str, optional): Placeholder name of :func:`retry_input`, whose value is the
+            last argument of the callback and is left out when matching late results
+    """
+
+    def decorator(func):
+        late = LRUCache(maxsize=late_results)
+        pending = {}
+        lock = threading.Lock()
+
+        def finish(key, future):
+            with lock:
+                pending.pop(key, None)
+                if future.exception() is None:
+                    late[key] = future.result()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            budget = CALLBACK_DEADLINE if seconds is None else seconds
+            if not budget:
+                return func(*args, **kwargs)
+
+            # The placeholder is on screen while the retry input has a value
+            waiting = retry is not None and bool(args[-1])
+            key = content_hash([args[:-1] if retry is not None else args, kwargs])
+            with lock:
+                result = late.pop(key, None)
+                future = pending.get(key)
+            if result is not None:
+                return result
+
+            if future is None:
+                # Copy the context so dash.ctx and the Flask request stay visible
+                context = contextvars.copy_context()
+                future = _EXECUTOR.submit(context.run, func, *args, **kwargs)
+            try:
+                return future.result(timeout=budget)
+            except FutureTimeoutError:
+                logger.warning("%s exceeded its %ss budget", func.__qualname__, budget)
+                with lock:
+                    is_new = key not in pending
+                    pending.setdefault(key, future)
+                if is_new:
+                    future.add_done_callback(functools.partial(finish, key))
+                if waiting:
+                    return no_update
+                if fallback:
+                    return fallback(*args, **kwargs)
+                return placeholder(retry, budget) if retry is not None else no_update
+
+        return wrapper
+
+    return decorator
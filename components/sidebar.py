@@ -1,8 +1,8 @@
 import dash_bootstrap_components as dbc
 import pandas as pd
-from dash import Input, Output, State, callback, dcc, html
+from dash import Input, Output, State, callback, clientside_callback, dcc, html
 
-from components.data.data import REGION_COUNTRIES, UNIQUE_REGIONS
+from components.data.data import get_dataset
 
 
 def create_sidebar():
@@ -117,28 +117,20 @@ def create_sidebar():
     )
 
 
-@callback(
+# Collapse or expand the sidebar in the browser; only its width changes
+clientside_callback(
+    """
+    function(n_clicks, isOpen, style) {
+        return [!isOpen, Object.assign({}, style, {width: isOpen ? "60px" : "250px"})];
+    }
+    """,
     Output("sidebar", "is_open"),
     Output("sidebar-container", "style"),
     Input("sidebar-toggle", "n_clicks"),
     State("sidebar", "is_open"),
+    State("sidebar-container", "style"),
     prevent_initial_call=True,
 )
-def toggle_sidebar(n_clicks, is_open):
-    sidebar_style = {
-        "padding": "1rem",
-        "background-color": "#f8f9fa",
-        "height": "100vh",
-        "width": "250px",
-        "position": "fixed",
-        "z-index": "1",  # Ensure sidebar stays behind the button
-        "transition": "all 0.3s",
-        "box-shadow": "3px 0 10px rgba(0,0,0,0.1)",
-        "top": "90px",  # Add top offset equal to navbar height
-    }
-
-    width = "60px" if is_open else "250px"
-    return not is_open, {**sidebar_style, "width": width}
 
 
 @callback(
@@ -151,9 +143,10 @@ def update_country_options(selected_region):
         return []
 
     # Handle multiple regions
+    region_countries = get_dataset().region_countries
     all_countries = []
     for region in selected_region:
-        all_countries.extend(REGION_COUNTRIES.get(region, []))
+        all_countries.extend(region_countries.get(region, []))
     return [{"label": country, "value": country} for country in sorted(set(all_countries))]
 
 
@@ -163,5 +156,5 @@ def update_country_options(selected_region):
 )
 def update_region_options(_):
     """Update region dropdown options."""
-    regions = UNIQUE_REGIONS
+    regions = get_dataset().unique_regions
     return [{"label": region, "value": region} for region in regions]
@@ -1,15 +1,19 @@
 import logging
+from functools import lru_cache
 
 import dash_bootstrap_components as dbc
 import pandas as pd
 import polars as pl
-from dash import Input, Output, callback, dcc, html
+from dash import Input, Output, State, callback, dcc, html
 
 logger = logging.getLogger(__name__)
 
 from components.common.filter_slider import create_filter_slider
 from components.common.gender_metric_selector import get_metric_column
 from components.common.year_slider import create_year_slider
+from components.data.data import get_dataset, metric_ranking
+from components.data.payload import decode_frame
+from components.deadline import deadline, retry_input
 from components.visualisations import (
     create_bar_plot,
     create_histogram_plot,
@@ -19,25 +23,33 @@ from components.visualisations import (
 )
 
 
-def create_geo_eco_tab():
-    """Function to create layout and visualations in the geo eco tab"""
+@lru_cache(maxsize=None)
+def create_geo_eco_tab(shared_controls=False):
+    """Function to create layout and visualations in the geo eco tab
+
+    With ``shared_controls`` the sliders are left out; they are shared by the tabs
+    (see ``create_tab_panes`` in ``application.py``).
+    """
     return dcc.Loading(
         dbc.Container(
             [
                 # Add Store component for data
-                dcc.Store(id="geo-eco-data"),
                 dcc.Store(id="sankey-data"),
                 dbc.Row(
                     [
                         dbc.Col(
-                            create_filter_slider(),
+                            None if shared_controls else create_filter_slider(),
                             width=12,
                         ),
                     ],
                     className="mb-3",
                 ),
                 html.Div(id="geo-eco-plots"),
-                create_year_slider(min_year=1990, max_year=2021, default=2021),
+                (
+                    None
+                    if shared_controls
+                    else create_year_slider(min_year=1990, max_year=2021, default=2021)
+                ),
             ],
             fluid=True,
         )
@@ -52,8 +64,11 @@ def create_geo_eco_tab():
     Input("gender-dropdown", "value"),
     Input("top-filter-slider", "value"),
     Input("year-slider", "value"),
+    State("age-dropdown", "value"),
+    retry_input("geo-eco-plots"),
 )
-def create_geo_eco_plots(data, sankey_data, metric, gender, top_n, year):
+@deadline(retry="geo-eco-plots")
+def create_geo_eco_plots(data, sankey_data, metric, gender, top_n, year, age, _retry=None):
     """Create a grid of plots using visualizations from visualisations.py."""
     if not data or not metric or not gender:
         print(
@@ -61,7 +76,7 @@ def create_geo_eco_plots(data, sankey_data, metric, gender, top_n, year):
         )
         return html.Div("Please select metric and gender", style={"margin": "20px"})
 
-    df = pl.DataFrame(data)
+    df = decode_frame(data)
 
     col = get_metric_column(gender, metric)
 
@@ -69,6 +84,12 @@ def create_geo_eco_plots(data, sankey_data, metric, gender, top_n, year):
     if not col or col not in df.columns:
         return html.Div("Selected metric data not available", style={"margin": "20px"})
 
+    # The top N countries of every chart are read from one ranking of the metric; without
+    # an age group countries repeat across ages, so the charts sort their rows instead
+    ranking = (
+        metric_ranking(get_dataset(), year, age, "Cardiovascular diseases", col) if age else None
+    )
+
     # Create plots
 
     return dcc.Loading(
@@ -92,6 +113,7 @@ def create_geo_eco_plots(data, sankey_data, metric, gender, top_n, year):
                                             # gender="Both",
                                             hue="WB_Income",
                                             top_n=top_n,
+                                            ranking=ranking,
                                         ),
                                         style={"height": "350px", "overflow": "auto"},
                                     ),
@@ -146,6 +168,7 @@ def create_geo_eco_plots(data, sankey_data, metric, gender, top_n, year):
                                                 subset=[col]
                                             ),
                                             top_n=top_n,
+                                            ranking=ranking,
                                         ),
                                         style={"height": "350px", "overflow": "auto"},
                                     ),
@@ -1,29 +1,34 @@
 import logging
+from functools import lru_cache
 
 import dash_bootstrap_components as dbc
 import pandas as pd
 import polars as pl
-from dash import Input, Output, callback, dcc, html
+from dash import Input, Output, State, callback, dcc, html
 
 from components.common.filter_slider import create_filter_slider
 from components.common.gender_metric_selector import get_metric_column
 from components.common.year_slider import create_year_slider
-from components.data.data import data_2019
+from components.data.data import get_dataset, metric_ranking
+from components.data.payload import decode_frame
 from components.visualisations import create_corr_matrix, create_scatter_plot
 
 logger = logging.getLogger(__name__)
 
 
-def create_healthcare_tab():
-    """Function to display the layout for the healthcare tab with visualizations."""
+@lru_cache(maxsize=None)
+def create_healthcare_tab(shared_controls=False):
+    """Function to display the layout for the healthcare tab with visualizations.
+
+    With ``shared_controls`` the sliders are left out; they are shared by the tabs
+    (see ``create_tab_panes`` in ``application.py``).
+    """
     return dcc.Loading(
         html.Div(
             [
-                dcc.Store(id="healthcare-data"),
-                dcc.Store(id="risk-data"),
-                create_filter_slider(),
+                None if shared_controls else create_filter_slider(),
                 html.Div(id="healthcare-plots"),
-                create_year_slider(),
+                None if shared_controls else create_year_slider(),
             ]
         )
     )
@@ -32,12 +37,12 @@ def create_healthcare_tab():
 @callback(
     Output("healthcare-plots", "children"),
     Input("healthcare-data", "data"),
-    Input("risk-data", "data"),
     Input("gender-dropdown", "value"),
     Input("metric-dropdown", "value"),
     Input("top-filter-slider", "value"),
+    State("age-dropdown", "value"),
 )
-def create_healthcare_plots(data, risk_data, gender, metric, top_n):
+def create_healthcare_plots(data, gender, metric, top_n, age):
     """Create healthcare-related visualizations in a grid layout.
 
     Returns:
@@ -47,7 +52,7 @@ def create_healthcare_plots(data, risk_data, gender, metric, top_n):
         return html.Div("Please select metric and gender")
 
     # Convert data to Polars DataFrame
-    df = pl.DataFrame(data)
+    df = decode_frame(data)
     logger.debug(f"first load view {df.head()}")
     if df.is_empty():
         return html.Div("No data available for the selected filters")
@@ -56,9 +61,18 @@ def create_healthcare_plots(data, risk_data, gender, metric, top_n):
     if not metric_col:
         return html.Div("No metric data available")
 
-    hypertension = data_2019
+    ds = get_dataset()
+    hypertension = ds.data_2019
     logger.debug(f"first load view htn {hypertension.head()}")
-    risk_data = pl.DataFrame(risk_data)
+
+    # Top N countries come from the rankings of the metric, sorted once per partition;
+    # without an age group countries repeat across ages, so the charts sort their rows
+    year = df["Year"][0]
+    cause = "Cardiovascular diseases"
+    male_col = get_metric_column("Male", metric)
+    ranking = metric_ranking(ds, year, age, cause, metric_col) if age else None
+    male_ranking = metric_ranking(ds, year, age, cause, male_col) if age and male_col else None
+    ranking_2019 = metric_ranking(ds, 2019, "Age-standardized", cause, metric_col)
 
     return dcc.Loading(
         dbc.Container(
@@ -83,6 +97,7 @@ def create_healthcare_plots(data, risk_data, gender, metric, top_n):
                                                 y_metric=metric_col,
                                                 top_n=top_n,
                                                 hue="WB_Income",
+                                                ranking=ranking,
                                             ),
                                             style={"height": "350px", "overflow": "auto"},
                                         ),
@@ -106,7 +121,7 @@ def create_healthcare_plots(data, risk_data, gender, metric, top_n):
                                         ),
                                         dbc.CardBody(
                                             create_corr_matrix(
-                                                risk_data  # data_2019.select(['obesity%','t_htn_ctrl','t_high_bp_30-79','pacemaker_1m','t_htn_diag','t_htn_rx_30-79', metric_col])
+                                                ds.risk_correlations.get(metric_col)
                                             ),
                                             style={"height": "350px", "overflow": "auto"},
                                         ),
@@ -137,6 +152,7 @@ def create_healthcare_plots(data, risk_data, gender, metric, top_n):
                                                 y_metric=metric_col,
                                                 hue="WB_Income",
                                                 top_n=50,
+                                                ranking=ranking_2019,
                                             ),
                                             style={"height": "350px", "overflow": "auto"},
                                         ),
@@ -162,10 +178,11 @@ def create_healthcare_plots(data, risk_data, gender, metric, top_n):
                                             create_scatter_plot(
                                                 data=df,
                                                 x_metric=get_metric_column("Female", metric),
-                                                y_metric=get_metric_column("Male", metric),
+                                                y_metric=male_col,
                                                 add_diagonal=True,
                                                 top_n=top_n,
                                                 hue="WB_Income",
+                                                ranking=male_ranking,
                                             ),
                                             style={"height": "350px", "overflow": "auto"},
                                         ),
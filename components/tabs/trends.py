@@ -1,15 +1,18 @@
 import logging
+from functools import lru_cache
 
 import dash_bootstrap_components as dbc
 import polars as pl
 from dash import Input, Output, callback, dcc, html
 
 from components.common.gender_metric_selector import get_metric_column
+from components.data.payload import decode_frame
 from components.visualisations import create_trend_plot
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=None)
 def create_trends_tab():
     """Function to create layout and visualations in the trends tab"""
     return dcc.Loading(
@@ -46,7 +49,7 @@ def update_trend_plots(trends_data, metric, gender):
     if not trends_data or not metric or not gender:
         return html.Div("No Data")
 
-    df = pl.DataFrame(trends_data)
+    df = decode_frame(trends_data)
 
     return dcc.Loading(
         create_trend_plot(df, metric, gender),
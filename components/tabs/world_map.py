@@ -1,22 +1,32 @@
 import logging
+from functools import lru_cache
 
 import dash_bootstrap_components as dbc
 import pandas as pd
-from dash import Input, Output, State, callback, dcc, html, no_update
+from dash import Input, Output, State, callback, clientside_callback, dcc, html, no_update
 
 logger = logging.getLogger(__name__)
 
 
 from components.common.year_slider import create_year_slider
+from components.data.payload import decode_frame
 from components.visualisations import create_chloropleth_map, create_tooltip
 
 
-def create_world_map_tab():
-    """Create the world map tab with choropleth map and year slider."""
+@lru_cache(maxsize=None)
+def create_world_map_tab(shared_controls=False):
+    """Create the world map tab with choropleth map and year slider.
+
+    With ``shared_controls`` the year slider is left out; it is shared by the tabs
+    (see ``create_tab_panes`` in ``application.py``).
+    """
     return html.Div(
         [
-            dcc.Store(id="general-data"),
-            dcc.Store(id="world-map-data"),
+            # In-browser playback: the request starts one server fetch of every year's
+            # frame, the year is the frame on screen
+            dcc.Store(id="map-playback-request"),
+            dcc.Store(id="map-playback-frames"),
+            dcc.Store(id="map-playback-year"),
             html.Div(
                 [
                     html.H2(
@@ -44,9 +54,13 @@ def create_world_map_tab():
                         ),
                         style={"position": "relative", "width": "100%", "height": "100%"},
                     ),
-                    html.Div(
-                        create_year_slider(),
-                        style={"height": "50px", "marginTop": "2px"},
+                    (
+                        None
+                        if shared_controls
+                        else html.Div(
+                            create_year_slider(client_playback=True),
+                            style={"height": "50px", "marginTop": "2px"},
+                        )
                     ),
                 ],
                 id="world-map-container",
@@ -61,18 +75,22 @@ def create_world_map_tab():
     )
 
 
-@callback(
+# Update the map title based on selected year and metric
+clientside_callback(
+    """
+    function(year, metric, gender) {
+        const suffix = gender !== "Both" ? ": " + gender : "";
+        if (!year || !metric) {
+            return "";
+        }
+        return metric + " for " + year + " " + suffix;
+    }
+    """,
     Output("map-title", "children"),
     Input("year-slider", "value"),
     Input("metric-dropdown", "value"),
     Input("gender-dropdown", "value"),
 )
-def update_map_title(year, metric, gender):
-    """Update the map title based on selected year and metric."""
-    gender = ": " + gender if gender != "Both" else ""
-    if not year or not metric:
-        return ""
-    return f"{metric} for {year} {gender}"
 
 
 @callback(
@@ -86,13 +104,107 @@ def update_map(filtered_data, metric, gender):
     if not filtered_data or not metric or not gender:
         return create_empty_message("Please select metric and gender")
 
-    df = pd.DataFrame(filtered_data)
-    if df.empty:
+    if decode_frame(filtered_data).is_empty():
         return create_empty_message("No data available for the selected filters")
 
     return create_chloropleth_map(filtered_data, metric, gender)
 
 
+# Play starts the interval from the slider's year, drops any earlier frames and asks the
+# server for the frames once; pause stops it and moves the slider to the year on screen,
+# which refreshes the data
+clientside_callback(
+    """
+    function(n_clicks, disabled, year, shownYear) {
+        const noUpdate = window.dash_clientside.no_update;
+        if (!n_clicks) {
+            return [true, "▶️", noUpdate, noUpdate, noUpdate, noUpdate];
+        }
+        if (disabled) {
+            return [false, "⏸️", Date.now(), year, noUpdate, null];
+        }
+        return [true, "▶️", noUpdate, noUpdate, shownYear || noUpdate, noUpdate];
+    }
+    """,
+    Output("map-playback-interval", "disabled"),
+    Output("map-play-button", "children"),
+    Output("map-playback-request", "data"),
+    Output("map-playback-year", "data"),
+    Output("year-slider", "value", allow_duplicate=True),
+    Output("map-playback-frames", "data", allow_duplicate=True),
+    Input("map-play-button", "n_clicks"),
+    State("map-playback-interval", "disabled"),
+    State("year-slider", "value"),
+    State("map-playback-year", "data"),
+    prevent_initial_call=True,
+)
+
+
+# A filter change makes the fetched frames stale: drop them and, while playing, fetch the
+# frames of the new selection
+clientside_callback(
+    """
+    function(regions, income, gender, metric, age, disabled) {
+        return [null, disabled ? window.dash_clientside.no_update : Date.now()];
+    }
+    """,
+    Output("map-playback-frames", "data", allow_duplicate=True),
+    Output("map-playback-request", "data", allow_duplicate=True),
+    Input("region-dropdown", "value"),
+    Input("income-dropdown", "value"),
+    Input("gender-dropdown", "value"),
+    Input("metric-dropdown", "value"),
+    Input("age-dropdown", "value"),
+    State("map-playback-interval", "disabled"),
+    prevent_initial_call=True,
+)
+
+
+# Each tick swaps the next year's values into the current figure without a request; ticks
+# are skipped until the frames of the current selection have arrived
+clientside_callback(
+    """
+    function(n_intervals, frames, year, figure, regions, income, gender, metric, age) {
+        const noUpdate = window.dash_clientside.no_update;
+        if (!frames || !frames.years || !figure || !figure.data || !figure.data.length) {
+            return [noUpdate, noUpdate, noUpdate];
+        }
+        const selection = [regions, income, gender, metric, age];
+        if (JSON.stringify(frames.selection) !== JSON.stringify(selection)) {
+            return [noUpdate, noUpdate, noUpdate];
+        }
+        const years = frames.years;
+        const next = years[(years.indexOf(year) + 1) % years.length];
+        const frame = frames.frames[String(next)];
+        const trace = Object.assign({}, figure.data[0], {
+            locations: frame.locations,
+            z: frame.z,
+            zmax: frames.zmax,
+        });
+        const suffix = gender !== "Both" ? ": " + gender : "";
+        return [
+            Object.assign({}, figure, {data: [trace]}),
+            metric + " for " + next + " " + suffix,
+            next,
+        ];
+    }
+    """,
+    Output("chloropleth-map", "figure", allow_duplicate=True),
+    Output("map-title", "children", allow_duplicate=True),
+    Output("map-playback-year", "data", allow_duplicate=True),
+    Input("map-playback-interval", "n_intervals"),
+    State("map-playback-frames", "data"),
+    State("map-playback-year", "data"),
+    State("chloropleth-map", "figure"),
+    State("region-dropdown", "value"),
+    State("income-dropdown", "value"),
+    State("gender-dropdown", "value"),
+    State("metric-dropdown", "value"),
+    State("age-dropdown", "value"),
+    prevent_initial_call=True,
+)
+
+
 def create_empty_message(message):
     """Create an empty figure with a centered message."""
     return {
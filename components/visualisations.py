@@ -1,6 +1,9 @@
+import hashlib
+import json
 import logging
 from collections import OrderedDict
 from functools import lru_cache
+from itertools import islice
 
 import dash_bootstrap_components as dbc
 import numpy as np
@@ -8,6 +11,7 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import polars as pl
+from cachetools.keys import hashkey
 from dash import dcc, html
 from scipy import stats
 from scipy.stats import t
@@ -15,7 +19,9 @@ from statsmodels.nonparametric.smoothers_lowess import lowess
 
 from components.common import gender_metric_selector
 from components.common.gender_metric_selector import get_metric_column
-from components.data.data import UNIQUE_INCOMES, UNIQUE_REGIONS, data
+from components.data.cache import SizedLRUCache, cached
+from components.data.data import cache_key, get_dataset, metric_bins, metric_ranking
+from components.data.payload import decode_frame
 
 logger = logging.getLogger(__name__)
 
@@ -60,10 +66,32 @@ def get_title_text(metric):
     return mapping.get(metric, metric).replace("_", " ").title()
 
 
+def take_top_n(data, metric, top_n, ranking=None):
+    """Return the ``top_n`` rows of ``data`` with the highest ``metric``, highest first.
+
+    With a ``ranking`` of the same partition (see
+    :func:`components.data.data.metric_ranking`) the countries are taken from it in order
+    instead of sorting ``data``. The ranking is keyed by country, so ``data`` is sorted
+    anyway when a country appears more than once in either, e.g. for several age groups.
+    """
+    if (
+        ranking is None
+        or ranking["Entity"].n_unique() < ranking.height
+        or data["Entity"].n_unique() < data.height
+    ):
+        return data.sort(metric, descending=True).limit(int(top_n))
+    rows = {entity: row for row, entity in enumerate(data["Entity"].cast(pl.Utf8).to_list())}
+    ranked = (rows[entity] for entity in ranking["Entity"].to_list() if entity in rows)
+    return data[list(islice(ranked, int(top_n)))]
+
+
 def create_scatter_plot(
-    x_metric, y_metric, data, size=None, hue=None, top_n=5, add_diagonal=False
+    x_metric, y_metric, data, size=None, hue=None, top_n=5, add_diagonal=False, ranking=None
 ):
-    """Create a scatter plot comparing two metrics with optional size and color encoding."""
+    """Create a scatter plot comparing two metrics with optional size and color encoding.
+
+    ``ranking`` is the ranking of ``y_metric`` the top N are taken from, if known.
+    """
     # print(f"Creating scatter plot: x={x_metric}, y={y_metric}, data shape={data.shape}")
     # print(f"Data columns: {data.columns.tolist()}")
     # print(f"Data values:\n{data[[x_metric, y_metric]].head()}")
@@ -84,7 +112,7 @@ def create_scatter_plot(
 
     # Take top N if specified
     if top_n:
-        plot_data = plot_data.sort(y_metric, descending=True).limit(int(top_n))
+        plot_data = take_top_n(plot_data, y_metric, top_n, ranking)
         print(f"After top_n filter: shape={plot_data.shape}")
 
     fig = px.scatter(
@@ -137,37 +165,42 @@ def create_scatter_plot(
 
 
 def create_tooltip(country_name, metric, gender, age, selected_year=None):
-    """Create a tooltip with time series plot and risk factors for a country."""
-    # Get data for the country
-    df = data
-    df = df.filter(pl.col("Entity").eq(country_name))
+    """Create a tooltip with time series plot and risk factors for a country.
 
-    if df.height == 0:
+    The figure is returned serialized; recent tooltips are answered from a cache. With a
+    selected year the title also gives the country's rank in that year.
+    """
+    return tooltip_content(get_dataset(), country_name, metric, gender, age, selected_year)
+
+
+@cached(cache=SizedLRUCache(), key=cache_key)
+def tooltip_content(ds, country_name, metric, gender, age, selected_year):
+    """Build a tooltip from the entity index of the dataset."""
+    dictionary = ds.dictionary
+    index = ds.entity_index
+    entity = dictionary.resolve("Entity", country_name)
+
+    if entity not in index.entities:
         return create_no_data_figure("No data available for this country"), {}
 
     # Get appropriate column based on metric and gender
     col = get_metric_column(gender, metric)
-    df = df.with_columns(pl.col(col).cast(pl.Float64, strict=False))
     is_percent = "percent" in metric.lower()
+    age_group = dictionary.resolve("age", age)
 
     # Create time series plot for cardiovascular diseases
-    cv_df = df.filter(
-        (pl.col("cause").str.to_lowercase().eq("cardiovascular diseases"))
-        & (pl.col("age").eq(age))
-    )
-    cv_df = cv_df.drop_nulls(subset=[col])
+    years, values = index.series(entity, age_group, ds.cardiovascular, col)
 
-    if cv_df.height == 0:
+    if len(years) == 0:
         return None, {"message": f"No data available for {metric} with age group: {age}"}
 
     fig = go.Figure()
 
     # Add main time series
-    cv_df_pd = cv_df.sort("Year").to_pandas()
     fig.add_trace(
         go.Scatter(
-            x=cv_df_pd["Year"],
-            y=cv_df_pd[col],
+            x=years,
+            y=values,
             mode="lines+markers",
             name="Actual",
         )
@@ -175,21 +208,28 @@ def create_tooltip(country_name, metric, gender, age, selected_year=None):
 
     # Add marker for selected year if provided
     if selected_year:
-        year_data = cv_df.filter(pl.col("Year").eq(selected_year))
-        if year_data.height > 0:
-            year_value = year_data.select(pl.col(col)).row(0)[0]
+        position = np.searchsorted(years, selected_year)
+        if position < len(years) and years[position] == selected_year:
             fig.add_trace(
                 go.Scatter(
                     x=[selected_year],
-                    y=[year_value],
+                    y=[float(values[position])],
                     mode="markers",
                     marker=dict(size=10, color="red"),
                     name=f"{selected_year}",
                 )
             )
 
+    title = f"{country_name} {metric} Over Time"
+    if selected_year and age_group:
+        # Rank among all countries in the selected year and age group
+        ranking = metric_ranking(ds, selected_year, age_group, ds.cardiovascular, col)
+        rank = ranking.filter(pl.col("Entity") == entity)["rank"]
+        if len(rank):
+            title += f"<br><sup>Rank {rank[0]} of {ranking.height} in {selected_year}</sup>"
+
     fig.update_layout(
-        title=f"{country_name} {metric} Over Time",
+        title=title,
         xaxis_title="Year",
         yaxis_title=metric,
         height=300,
@@ -200,20 +240,11 @@ def create_tooltip(country_name, metric, gender, age, selected_year=None):
     risk_factors = OrderedDict()
 
     if selected_year:
-        # Add other causes
-        other_causes = df.filter(
-            (pl.col("Year").eq(selected_year))
-            & ~(pl.col("cause").str.to_lowercase().str.contains("cardiovascular diseases"))
-            & (pl.col("age").eq(age))
-        )
-        other_causes = other_causes.drop_nulls(subset=[col])
+        # Add other causes, already sorted by value
+        for cause, value in index.ranking(entity, age_group, selected_year, col):
+            risk_factors[cause] = format_value(value, is_percent=is_percent)
 
-        # Sort causes by value and add to risk factors
-        other_causes = other_causes.sort(col, descending=True)
-        for row in other_causes.iter_rows(named=True):
-            risk_factors[row["cause"]] = format_value(row[col], is_percent=is_percent)
-
-    return fig, risk_factors
+    return json.loads(fig.to_json()), risk_factors
 
 
 def create_trend_plot(data, metric, gender):
@@ -238,13 +269,22 @@ def create_trend_plot(data, metric, gender):
     }
 
     # Add traces for each cause
-    for cause in df["cause"].unique():
+    for cause in df["cause"].unique(maintain_order=True):
         cause_data = df.filter(pl.col("cause").eq(cause))
-        yearly_data = cause_data.group_by("Year").agg(pl.col(col).mean()).sort("Year")
+        if "is_projection" in cause_data.columns:
+            yearly_data = (
+                cause_data.group_by("Year")
+                .agg(pl.col(col).mean(), pl.col("is_projection").any())
+                .sort("Year")
+            )
+            actual = yearly_data.filter(~pl.col("is_projection"))
+            projected = yearly_data.filter(pl.col("is_projection"))
+        else:
+            yearly_data = cause_data.group_by("Year").agg(pl.col(col).mean()).sort("Year")
 
-        # Split data at 2021.5
-        actual = yearly_data.filter(pl.col("Year") <= 2021.5)
-        projected = yearly_data.filter(pl.col("Year") > 2021.5)
+            # Split data at 2021.5
+            actual = yearly_data.filter(pl.col("Year") <= 2021.5)
+            projected = yearly_data.filter(pl.col("Year") > 2021.5)
 
         color = colors.get(cause, "#17becf")
 
@@ -390,7 +430,7 @@ def create_line_plot(metric, data, top_n=5, n_metric=None):
     return dcc.Graph(figure=fig, style={"height": "100%"}, config={"displayModeBar": False})
 
 
-def create_bar_plot(metric, data, top_n=5, color=None):
+def create_bar_plot(metric, data, top_n=5, color=None, ranking=None):
     """Create a bar plot for a given metric.
 
     Args:
@@ -398,11 +438,13 @@ def create_bar_plot(metric, data, top_n=5, color=None):
         data (pd.DataFrame): Data to plot
         top_n (int, optional): Number of top entries to show. Defaults to 5.
         color (str, optional): Column to use for color coding. Defaults to None.
+        ranking (pl.DataFrame, optional): Ranking of ``metric`` to take the top entries
+            from instead of sorting ``data``.
     """
     if isinstance(data, pd.DataFrame):
         df = pl.from_pandas(data)
     elif isinstance(data, (list, dict)):
-        df = pl.DataFrame(data)
+        df = decode_frame(data)
     else:
         df = data
     # df =data
@@ -410,7 +452,7 @@ def create_bar_plot(metric, data, top_n=5, color=None):
         return create_no_data_figure("No data available")
 
     # Get top N entries by metric value
-    df = df.sort(metric, descending=True).limit(top_n)
+    df = take_top_n(df, metric, top_n, ranking)
 
     fig = px.bar(
         data_frame=df.to_pandas(),
@@ -447,7 +489,7 @@ def create_chloropleth_map(filtered_data, metric, gender="Both"):
     """Create a choropleth map visualization from filtered data.
 
     Args:
-        filtered_data (list): List of dictionaries containing filtered data
+        filtered_data (dict): Store payload containing filtered data
         metric (str): Selected metric name
         gender (str, optional): Selected gender. Defaults to "Both".
 
@@ -455,8 +497,8 @@ def create_chloropleth_map(filtered_data, metric, gender="Both"):
         plotly.graph_objects.Figure: The choropleth map figure
     """
 
-    # Convert list of dicts to DataFrame
-    df = pd.DataFrame(filtered_data)
+    # Convert the store payload to a DataFrame
+    df = decode_frame(filtered_data).to_pandas()
     if df.empty:
         return create_no_data_figure("No data available for selected filters")
 
@@ -523,71 +565,49 @@ def create_chloropleth_map(filtered_data, metric, gender="Both"):
 
 
 def create_sankey_diagram(data, metric, gender):
-    """Create a Sankey diagram showing flow between Region -> Income -> Metric Ranges."""
-    df = pd.DataFrame(data)
-    # df = data
-    if df.empty:
+    """Create a Sankey diagram showing flow between Region -> Income -> Metric Ranges.
+
+    The metric ranges are bins of the metric over every country of the year (see
+    :func:`components.data.data.metric_bins`), so they stay the same across filters.
+    """
+    df = decode_frame(data)
+    if df.is_empty():
         return create_no_data_figure("No data available")
 
     metric = get_metric_column(gender, metric)
+    logger.debug(msg=df.columns)
 
-    # df = data
-    logger.debug(msg=df.columns.tolist())
-    df[metric] = df[metric].astype(float)
-    print(df.dtypes)
-
-    if df.empty:
-        return create_no_data_figure("No data available")
-
-    try:
+    edges, quartiles = metric_bins(get_dataset(), metric, df["Year"][0])
+    if quartiles:
         labels = [f"{get_title_text(metric)} ({i}%)" for i in ["0-25", "25-50", "50-75", "75-100"]]
-        df["metric_range"] = pd.qcut(df[metric], q=4, labels=labels, duplicates="drop")
-    except ValueError:
-        bins = [
-            df[metric].min(),
-            df[metric].mean() / 2,
-            df[metric].mean(),
-            df[metric].mean() * 1.5,
-            df[metric].max(),
-        ]
+    else:
         labels = [
             f"{get_title_text(metric)} (Low)",
             f"{get_title_text(metric)} (Medium-Low)",
             f"{get_title_text(metric)} (Medium-High)",
             f"{get_title_text(metric)} (High)",
         ]
-        df["metric_range"] = pd.cut(df[metric], bins=bins, labels=labels, duplicates="drop")
+    df = df.with_columns(
+        pl.col(metric).cast(pl.Float64).cut(edges, labels=labels).alias("metric_range")
+    )
 
-    regions = df["region"].unique().tolist()
-    incomes = df["WB_Income"].unique().tolist()
-    ranges = df["metric_range"].unique().tolist()
+    # Nodes in order of appearance, then every link from a single grouped count
+    regions = df["region"].unique(maintain_order=True).to_list()
+    incomes = df["WB_Income"].unique(maintain_order=True).to_list()
+    ranges = df["metric_range"].cast(pl.Utf8).unique(maintain_order=True).to_list()
     nodes = regions + incomes + ranges
-    sources, targets, values = [], [], []
-    link_colors = []
-
-    for region in regions:
-        region_idx = nodes.index(region)
-        region_data = df[df["region"] == region]
-        for income in incomes:
-            income_idx = nodes.index(income)
-            income_data = region_data[region_data["WB_Income"] == income]
-            if not income_data.empty:
-                sources.append(region_idx)
-                targets.append(income_idx)
-                values.append(len(income_data))
-                link_colors.append("rgba(31, 119, 180, 0.4)")  # Light blue
-
-    for income in incomes:
-        income_idx = nodes.index(income)
-        income_data = df[df["WB_Income"] == income]
-        for range_val in ranges:
-            range_idx = nodes.index(range_val)
-            range_data = income_data[income_data["metric_range"] == range_val]
-            if not range_data.empty:
-                sources.append(income_idx)
-                targets.append(range_idx)
-                values.append(len(range_data))
-                link_colors.append("rgba(44, 160, 44, 0.4)")  # Light green
+    # The first position of a label wins, as with nodes.index()
+    node_index = {node: i for i, node in reversed(list(enumerate(nodes)))}
+
+    flows = df.group_by("region", "WB_Income", pl.col("metric_range").cast(pl.Utf8)).len()
+    links = []
+    for source, target, color in [
+        ("region", "WB_Income", "rgba(31, 119, 180, 0.4)"),  # Light blue
+        ("WB_Income", "metric_range", "rgba(44, 160, 44, 0.4)"),  # Light green
+    ]:
+        counts = flows.group_by(source, target).agg(pl.col("len").sum())
+        links += sorted((node_index[s], node_index[t], n, color) for s, t, n in counts.iter_rows())
+    sources, targets, values, link_colors = (list(column) for column in zip(*links))
 
     node_colors = (
         ["#1f77b4"] * len(regions) + ["#2ca02c"] * len(incomes) + ["#ff7f0e"] * len(ranges)
@@ -624,13 +644,42 @@ def create_sankey_diagram(data, metric, gender):
     return dcc.Graph(figure=fig, style={"height": "100%"}, config={"displayModeBar": False})
 
 
-def create_histogram_plot(metric: str, data: pl.DataFrame, bins: int = 30) -> go.Figure:
+def histogram_key(metric, values, bins):
+    """Cache key of a histogram: its column, its bin count and a digest of its values.
+
+    The digest stands for the year and the filters, which only matter through the values.
+    """
+    return hashkey(metric, bins, hashlib.blake2b(values.tobytes(), digest_size=16).hexdigest())
+
+
+@cached(cache=SizedLRUCache(), key=histogram_key)
+def histogram_bins(metric, values, bins):
+    """Return the bin edges, counts and mean of ``values``.
+
+    Bins have a round width (1, 2 or 5 times a power of ten) so that at most ``bins`` of
+    them cover the values, as in Plotly's own binning.
+    """
+    low, high = float(values.min()), float(values.max())
+    raw = (high - low) / bins or abs(low) or 1.0
+    magnitude = 10 ** np.floor(np.log10(raw))
+    size = next(step * magnitude for step in (1, 2, 5, 10) if step * magnitude >= raw)
+    start = np.floor(low / size) * size
+    edges = start + size * np.arange(int((high - start) // size) + 2)
+    counts, edges = np.histogram(values, bins=edges)
+    return edges.tolist(), counts.tolist(), float(values.mean())
+
+
+def create_histogram_plot(
+    metric: str, data: pl.DataFrame, bins: int = 30, aggregate: bool = True
+) -> go.Figure:
     """Create a histogram plot showing the distribution of a metric.
 
     Args:
         metric (str): Column name to plot
         data (pl.DataFrame): Data to plot
         bins (int, optional): Number of bins for histogram. Defaults to 30.
+        aggregate (bool, optional): Bin on the server and send only the bars, cached per
+            column and values. Otherwise every value is sent and binned in the browser.
 
     Returns:
         go.Figure: Plotly figure object
@@ -640,11 +689,30 @@ def create_histogram_plot(metric: str, data: pl.DataFrame, bins: int = 30) -> go
 
     title = get_title_text(metric)
 
-    # Convert to pandas for plotly compatibility
-    df = data.select([metric]).to_pandas()
+    if aggregate:
+        values = data[metric].cast(pl.Float64).to_numpy()
+        edges, counts, mean_val = histogram_bins(metric, values, bins)
+        fig = go.Figure(
+            go.Bar(
+                x=[(lo + hi) / 2 for lo, hi in zip(edges, edges[1:])],
+                y=counts,
+                width=edges[1] - edges[0],
+                customdata=list(zip(edges, edges[1:])),
+                hovertemplate=f"{title}: %{{customdata[0]:.4g}} - %{{customdata[1]:.4g}}"
+                "<br>Count: %{y}<extra></extra>",
+                opacity=0.75,
+            )
+        )
+        fig.update_layout(title=title, bargap=0)
+    else:
+        # Convert to pandas for plotly compatibility
+        df = data.select([metric]).to_pandas()
 
-    # Create histogram
-    fig = px.histogram(df, x=metric, nbins=bins, title=title, labels={metric: title}, opacity=0.75)
+        # Create histogram
+        fig = px.histogram(
+            df, x=metric, nbins=bins, title=title, labels={metric: title}, opacity=0.75
+        )
+        mean_val = df[metric].mean()
 
     # Update layout
     fig.update_layout(
@@ -658,7 +726,6 @@ def create_histogram_plot(metric: str, data: pl.DataFrame, bins: int = 30) -> go
     )
 
     # Add mean line
-    mean_val = df[metric].mean()
     fig.add_vline(
         x=mean_val,
         line_dash="dash",
@@ -670,10 +737,11 @@ def create_histogram_plot(metric: str, data: pl.DataFrame, bins: int = 30) -> go
     return dcc.Graph(figure=fig, style={"height": "100%"}, config={"displayModeBar": False})
 
 
-def create_corr_matrix(data: pl.DataFrame) -> dcc.Graph:
-    """Create a correlation matrix of all numeric columns in the data."""
+def create_corr_matrix(corr_matrix: pl.DataFrame) -> dcc.Graph:
+    """Plot a correlation matrix, e.g. one of the dataset's ``risk_correlations``."""
+    if corr_matrix is None or corr_matrix.is_empty():
+        return create_no_data_figure()
 
-    corr_matrix = data.corr()
     fig = px.imshow(corr_matrix, text_auto=".2f", color_continuous_scale="blues")
     fig.update_layout(
         **BASE_LAYOUT,
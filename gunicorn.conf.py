@@ -0,0 +1,121 @@
+"""Gunicorn settings for the dashboard.
+
+``GUNICORN_PRELOAD=1`` imports the application once in the master before the workers
+are forked, so the imported code and the layout are shared copy-on-write by every worker.
+The dataset is never built in the master: Polars' thread pool does not survive a fork,
+so a worker forked after a Polars query hangs on its own first query. Each worker builds
+the dataset after the fork instead; the memory-mapped snapshot columns it reads are
+shared between workers through the OS page cache.
+
+``HEART_SNAPSHOT_SHM=1`` copies the Arrow snapshots to ``/dev/shm`` before the app is
+loaded so the memory-mapped columns stay resident in shared memory. The reloader still
+watches the original snapshots and copies a rebuilt one over its copy.
+
+The dataset is built lazily on first use; the worker hook builds it eagerly instead,
+before the worker accepts requests, and logs how long each member took. With
+``DATA_RELOAD_INTERVAL`` every worker also starts a thread that reloads the dataset when
+its files change, and ``WARMUP_MODE`` warms the caches of the default and popular views.
+
+With ``RESULT_STORE=server`` and more than one worker, ``RESULT_STORE_DIR`` is required
+and the master refuses to start without it.
+
+Startup time and per-process memory (RSS, PSS and shared pages) are logged for the
+master and for every worker so the savings can be checked after a deploy.
+"""
+
+import gc
+import os
+import time
+
+STARTED = time.perf_counter()
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "0") == "1"
+
+SHM_DIR = os.getenv("HEART_SNAPSHOT_SHM_DIR", "/dev/shm/heart-disease")
+
+
+def _copy_snapshots_to_shm():
+    """Copy the snapshots to shared memory and point the loaders at the copies."""
+    from components.data import snapshot
+
+    snapshot.copy_snapshots(SHM_DIR)
+
+
+if os.getenv("HEART_SNAPSHOT_SHM", "0") == "1":
+    _copy_snapshots_to_shm()
+
+
+def memory_usage():
+    """Return RSS, PSS and shared memory of the current process in MiB (Linux only)."""
+    usage = {}
+    try:
+        with open("/proc/self/smaps_rollup", encoding="utf-8") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("Rss", "Pss", "Shared_Clean", "Shared_Dirty"):
+                    usage[key] = int(value.split()[0]) / 1024
+    except OSError:
+        return {}
+    return {
+        "rss": usage.get("Rss", 0.0),
+        "pss": usage.get("Pss", 0.0),
+        "shared": usage.get("Shared_Clean", 0.0) + usage.get("Shared_Dirty", 0.0),
+    }
+
+
+def _format_memory(usage):
+    if not usage:
+        return "memory n/a"
+    return "rss=%.1fMiB pss=%.1fMiB shared=%.1fMiB" % (usage["rss"], usage["pss"], usage["shared"])
+
+
+def _build_dataset(log):
+    """Build every dataset member now so no request pays for it."""
+    from components.data.data import initialize
+
+    for name, seconds in sorted(initialize().items(), key=lambda item: -item[1]):
+        log.info("Dataset member %s built in %.3fs", name, seconds)
+
+
+def on_starting(server):
+    """Refuse to start workers that could not read each other's stored results."""
+    if (
+        os.getenv("RESULT_STORE", "client") == "server"
+        and not os.getenv("RESULT_STORE_DIR")
+        and server.cfg.workers > 1
+    ):
+        raise RuntimeError(
+            "RESULT_STORE=server with %d workers needs RESULT_STORE_DIR: a handle written by "
+            "one worker cannot be read by another" % server.cfg.workers
+        )
+
+
+def when_ready(server):
+    """Log master startup time; with preload this includes importing the application."""
+    if preload_app:
+        # Move everything built at import out of the collector's generations so GC
+        # passes in the workers do not write to (and un-share) those pages
+        gc.freeze()
+    server.log.info(
+        "Master ready in %.2fs (preload=%s, workers=%s) %s",
+        time.perf_counter() - STARTED,
+        preload_app,
+        server.cfg.workers,
+        _format_memory(memory_usage()),
+    )
+
+
+def post_worker_init(worker):
+    """Log how long each worker took to become ready and what memory it uses."""
+    from components.data.reload import start_reloader
+    from components.data.warmup import start_warmup
+
+    _build_dataset(worker.log)
+    start_warmup()
+    start_reloader()
+    worker.log.info(
+        "Worker %s ready %.2fs after master start %s",
+        worker.pid,
+        time.perf_counter() - STARTED,
+        _format_memory(memory_usage()),
+    )
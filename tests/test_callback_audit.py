@@ -0,0 +1,8 @@
+"""Check that every server-side callback of the app needs the server."""
+
+from application import app
+from components.callback_audit import audit_callbacks
+
+
+def test_no_callback_could_run_clientside():
+    assert audit_callbacks(app) == []